@@ -0,0 +1,344 @@
+"""
+This script runs the benchmark suite and compares two of its runs.
+
+run times every benchmark with a fixed seed, first a number of warmup runs and then
+a number of timed repeats, so every repeat does exactly the same work:
+
+    setup_board/<board>           Board.setup_board from the DataFrame of a gameboard
+    move_piece/<board>            move_piece and update_positions_set along a random walk
+    next_states/<board>           the moves generated from every state of the random walk
+    solve/<algorithm>/<board>     every search algorithm on every board in `data/gameboards`
+    random_board/<size>x<cars>    generator.random_board, from sparse to dense boards
+    random_board_records/<...>    the same boards, without building DataFrames
+    import/<module>               the import of every headless module in a fresh process
+
+The results are printed and written as JSON, by default to `data/benchmarks/`.
+The run fails if a headless module imports plotting, pandas or the progress bar,
+as that would slow down every worker process. With -i only the imports are checked.
+
+compare reads two result files and flags every benchmark that became slower than
+the threshold, and fails if there is one.
+
+Usage:
+    python benchmark.py [run] [optional arguments]
+    python benchmark.py compare <old results> <new results> [-th <threshold>]
+
+Optional arguments of run:
+    -r, --repeats <repeats>
+    -w, --warmup <warmup>
+    -s, --steps <steps>
+    -sd, --seed <seed>
+    -b, --boards <boards>
+    -mm, --move_max <move_max>
+    -k, --filter <text>
+    -o, --output <path>
+    -i, --imports
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+from code_files.classes.board_setup import Board
+from code_files.classes.budget import Budget
+from code_files.classes.gameboards import board_size, gameboard_paths, load_board, read_records
+from code_files.algorithms.generator import board_frame, random_board, random_boards
+from code_files.algorithms.randomise import random_step
+from code_files.algorithms.solvers import SOLVERS, solve
+
+# (size, num_cars) of the generated boards, from sparse to dense
+GENERATOR_CONFIGS = [(6, 8), (6, 12), (9, 20), (9, 28), (12, 30), (12, 50)]
+
+# Number of boards set up per repeat of setup_board
+SETUPS = 200
+
+# Modules that solve boards without the interface, and the modules they must not import
+HEADLESS_MODULES = ['code_files.classes.board_setup', 'code_files.classes.gameboards', 'code_files.classes.puzzle_pack',
+                    'code_files.classes.puzzle_lines', 'code_files.algorithms.solvers', 'solve']
+HEAVY_MODULES = ['pandas', 'numpy', 'matplotlib', 'seaborn', 'tqdm', 'tkinter']
+
+
+def summary(times, work):
+    """
+    Summarises the timed repeats of a benchmark.
+
+    Parameters
+    ----------
+        times list : Seconds of every repeat.
+        work int : Number of operations done by one repeat, e.g. moves or boards.
+
+    Returns
+    -------
+        result dict : The times, their minimum, median, mean and standard deviation, and the operations per second.
+    """
+    median = statistics.median(times)
+    return {'times': times, 'min': min(times), 'median': median, 'mean': statistics.mean(times),
+            'stdev': statistics.stdev(times) if len(times) > 1 else 0.0, 'work': work,
+            'per_second': work / median if median else None}
+
+
+def measure(run, repeats, warmup):
+    """
+    Times a benchmark after warming it up.
+
+    Parameters
+    ----------
+        run function : Does the work of one repeat and returns the number of operations done.
+        repeats int : Number of timed repeats.
+        warmup int : Number of runs before the timed repeats.
+
+    Returns
+    -------
+        result dict : The summary of the repeats.
+    """
+    for _ in range(warmup):
+        run()
+
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        work = run()
+        times.append(time.perf_counter() - start)
+    return summary(times, work)
+
+
+def random_walk(path, steps, seed):
+    """
+    Makes a random walk with a fixed seed.
+
+    Returns
+    -------
+        board Board : The board, back in its starting state.
+        walk list : (vehicle name, movement, state before the move) of every step.
+    """
+    random.seed(seed)
+    board = load_board(path)
+    start = board.get_state()
+
+    walk = []
+    for _ in range(steps):
+        state = board.get_state()
+        name, movement, position = random_step(board)
+        board.update_positions_set(board.find_vehicle(name), position)
+        walk.append((name, movement, state))
+
+    board.set_state(start)
+    return board, walk
+
+
+def board_benchmarks(path, args):
+    """Returns the (name, run) of the setup, move and move generation benchmarks of a gameboard."""
+    name = os.path.splitext(os.path.basename(path))[0]
+    size = board_size(path)
+    frame = board_frame(read_records(path))
+    board, walk = random_walk(path, args.steps, args.seed)
+    start = board.get_state()
+
+    def setup():
+        for _ in range(SETUPS):
+            Board(size).setup_board(frame)
+        return SETUPS
+
+    def move():
+        board.set_state(start)
+        for vehicle, movement, _ in walk:
+            board.update_positions_set(board.find_vehicle(vehicle), board.move_piece(vehicle, movement))
+        return len(walk)
+
+    def generate():
+        return sum(len(board.next_states(state)) for _, _, state in walk)
+
+    return [(f'setup_board/{name}', setup), (f'move_piece/{name}', move), (f'next_states/{name}', generate)]
+
+
+def solver_benchmarks(path, args):
+    """Returns the (name, run) of every search algorithm on a gameboard, limited to args.move_max expanded states."""
+    name = os.path.splitext(os.path.basename(path))[0]
+    board = load_board(path)
+
+    def solver(algorithm):
+        def run():
+            return solve(board, algorithm, budget=Budget(args.move_max)).nodes_expanded
+        return run
+
+    return [(f'solve/{algorithm}/{name}', solver(algorithm)) for algorithm in sorted(SOLVERS)]
+
+
+def generator_benchmarks(args):
+    """Returns the (name, run) of the generator benchmarks of every setting in GENERATOR_CONFIGS."""
+    def frames(size, num_cars):
+        def run():
+            random.seed(args.seed)
+            for _ in range(args.boards):
+                random_board(size, num_cars, (3, 1), 1, 2)
+            return args.boards
+        return run
+
+    def records(size, num_cars):
+        def run():
+            random.seed(args.seed)
+            random_boards(args.boards, size, num_cars, (3, 1), 1, 2, frames=False)
+            return args.boards
+        return run
+
+    benchmarks = []
+    for size, num_cars in GENERATOR_CONFIGS:
+        benchmarks.append((f'random_board/{size}x{num_cars}', frames(size, num_cars)))
+        benchmarks.append((f'random_board_records/{size}x{num_cars}', records(size, num_cars)))
+    return benchmarks
+
+
+def import_time(module, repeats=5):
+    """
+    Imports a module in fresh processes and times the import.
+
+    Returns
+    -------
+        times list : The import time of every repeat in seconds.
+        heavy list : The modules of HEAVY_MODULES that were imported with it.
+    """
+    code = ("import sys, time\n"
+            "start = time.perf_counter()\n"
+            f"import {module}\n"
+            "print(time.perf_counter() - start)\n"
+            f"print(','.join(name for name in {HEAVY_MODULES!r} if name in sys.modules))")
+    times = []
+    for _ in range(repeats):
+        output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.split('\n')
+        times.append(float(output[0]))
+    return times, [name for name in output[1].split(',') if name]
+
+
+def imports(results=None, repeats=5):
+    """
+    Prints the import time of the headless modules.
+
+    Parameters
+    ----------
+        results dict : If given, the summary of every import is added to it as import/<module>.
+        repeats int : Number of fresh processes per module.
+
+    Returns
+    -------
+        headless bool : False if one of the modules imports a heavy module.
+    """
+    print(f"{'module':<36}{'ms':>8}  heavy imports")
+    headless = True
+    for module in HEADLESS_MODULES:
+        times, heavy = import_time(module, repeats)
+        headless = headless and not heavy
+        if results is not None:
+            results[f'import/{module}'] = summary(times, 1)
+        print(f"{module:<36}{min(times) * 1000:>8.1f}  {', '.join(heavy) or '-'}")
+    return headless
+
+
+def run_suite(args):
+    """Runs the benchmarks whose name contains args.filter, prints them and writes the results as JSON."""
+    if args.imports:
+        sys.exit(0 if imports() else 1)
+
+    benchmarks = []
+    for path in gameboard_paths():
+        benchmarks += board_benchmarks(path, args)
+    for path in gameboard_paths():
+        benchmarks += solver_benchmarks(path, args)
+    benchmarks += generator_benchmarks(args)
+
+    results = {}
+    print(f"{'benchmark':<44}{'median ms':>12}{'stdev ms':>10}{'ops/s':>12}")
+    for name, run in benchmarks:
+        if args.filter and args.filter not in name:
+            continue
+        result = results[name] = measure(run, args.repeats, args.warmup)
+        print(f"{name:<44}{result['median'] * 1000:>12.2f}{result['stdev'] * 1000:>10.2f}{result['per_second']:>12.0f}")
+    print()
+
+    headless = imports(results, args.repeats) if not args.filter or 'import/' in args.filter else True
+
+    output = args.output or os.path.join('data', 'benchmarks', time.strftime('benchmark-%Y%m%d-%H%M%S.json'))
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    meta = {'date': time.strftime('%Y-%m-%d %H:%M:%S'), 'python': platform.python_version(), 'platform': platform.platform(),
+            'repeats': args.repeats, 'warmup': args.warmup, 'steps': args.steps, 'seed': args.seed,
+            'boards': args.boards, 'move_max': args.move_max}
+    with open(output, 'w') as file:
+        json.dump({'meta': meta, 'benchmarks': results}, file, indent=1)
+    print(f"\nResults written to {output}")
+
+    if not headless:
+        sys.exit("A headless module imports plotting, pandas or the progress bar")
+
+
+def compare(args):
+    """Prints the change of every benchmark in two result files, and fails if one became slower than args.threshold."""
+    with open(args.old) as file:
+        old = json.load(file)['benchmarks']
+    with open(args.new) as file:
+        new = json.load(file)['benchmarks']
+
+    regressions = []
+    print(f"{'benchmark':<44}{'old ms':>10}{'new ms':>10}{'change':>9}")
+    for name in sorted(old.keys() & new.keys()):
+        before, after = old[name][args.metric], new[name][args.metric]
+        change = after / before - 1 if before else 0.0
+        flag = ''
+        if change > args.threshold:
+            flag = '  REGRESSION'
+            regressions.append(name)
+        if old[name]['work'] != new[name]['work']:
+            # e.g. a search that expands a different number of states, so the times are not comparable
+            flag += f"  work changed {old[name]['work']} -> {new[name]['work']}"
+        print(f"{name:<44}{before * 1000:>10.2f}{after * 1000:>10.2f}{change:>+9.1%}{flag}")
+
+    for name in sorted(old.keys() - new.keys()):
+        print(f"{name}: only in {args.old}")
+    for name in sorted(new.keys() - old.keys()):
+        print(f"{name}: only in {args.new}")
+
+    if regressions:
+        sys.exit(f"{len(regressions)} benchmarks are more than {args.threshold:.0%} slower")
+    print(f"No benchmark is more than {args.threshold:.0%} slower")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the benchmark suite, or compare two of its runs.")
+    commands = parser.add_subparsers(dest='command')
+
+    run_parser = commands.add_parser('run', help='Run the benchmarks and write the results as JSON (default)')
+    run_parser.add_argument('-r', '--repeats', type=int, default=5, help='Number of timed repeats per benchmark (default: 5)')
+    run_parser.add_argument('-w', '--warmup', type=int, default=1, help='Number of untimed runs before the repeats (default: 1)')
+    run_parser.add_argument('-s', '--steps', type=int, default=2000, help='Number of random steps per board (default: 2000)')
+    run_parser.add_argument('-sd', '--seed', type=int, default=0, help='Seed of the random walk and the generator (default: 0)')
+    run_parser.add_argument('-b', '--boards', type=int, default=200, help='Number of random boards per generator setting (default: 200)')
+    run_parser.add_argument('-mm', '--move_max', type=int, default=5000, help='Maximum number of states the searches expand (default: 5000)')
+    run_parser.add_argument('-k', '--filter', default=None, help='Only run the benchmarks whose name contains this text')
+    run_parser.add_argument('-o', '--output', default=None, help='Path of the JSON results (default: data/benchmarks/benchmark-<date>.json)')
+    run_parser.add_argument('-i', '--imports', action='store_true', help='Only check the import time of the headless modules')
+
+    compare_parser = commands.add_parser('compare', help='Compare two result files and fail on regressions')
+    compare_parser.add_argument('old', help='Results of the baseline run')
+    compare_parser.add_argument('new', help='Results of the new run')
+    compare_parser.add_argument('-th', '--threshold', type=float, default=0.1, help='Slowdown flagged as a regression (default: 0.1, 10%%)')
+    compare_parser.add_argument('-m', '--metric', choices=['median', 'min', 'mean'], default='median', help='Time that is compared (default: median)')
+
+    # Without a command the benchmarks are run
+    argv = sys.argv[1:]
+    if not argv or argv[0] not in ('run', 'compare', '-h', '--help'):
+        argv = ['run'] + argv
+    args = parser.parse_args(argv)
+
+    if args.command == 'compare':
+        compare(args)
+    else:
+        run_suite(args)
+
+
+if __name__ == "__main__":
+    main()
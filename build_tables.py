@@ -0,0 +1,49 @@
+"""
+This script builds the distance tables of the gameboards in `data/gameboards`.
+
+For every board all states it can reach are enumerated, and the exact number
+of moves to win from each of them is stored in `data/tables/`. The tables are
+used by `manual.py -tb`, the hints in the interface and can be opened with
+`DistanceTable.open_for(board)`.
+
+Usage:
+    python build_tables.py [-n <node_max>] [-f]
+
+Optional arguments:
+    -n, --node_max <node_max>
+    -f, --force
+"""
+
+import argparse
+import os
+import time
+
+from code_files.classes.distance_table import DistanceTable
+from code_files.classes.gameboards import gameboard_paths, load_board
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the distance tables of the gameboards.")
+    parser.add_argument('-n', '--node_max', type=int, default=2000000, help='Skip boards that can reach more states than this (default: 2000000)')
+    parser.add_argument('-f', '--force', action='store_true', help='Rebuild tables that already exist')
+    args = parser.parse_args()
+
+    for path in gameboard_paths():
+        board = load_board(path)
+        name = os.path.basename(path)
+        if not args.force and os.path.exists(DistanceTable.path_for(board)):
+            print(f"{name}: table already exists")
+            continue
+
+        start_time = time.time()
+        try:
+            table = DistanceTable.build(board, node_max=args.node_max)
+        except ValueError as e:
+            print(f"{name}: skipped, {e}")
+            continue
+
+        print(f"{name}: {table.num_states} states, {table.distance(board.get_state())} moves to win, {time.time() - start_time:.1f} seconds")
+
+
+if __name__ == "__main__":
+    main()
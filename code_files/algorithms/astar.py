@@ -0,0 +1,132 @@
+"""
+Function for the A* search algorithm and its heuristics.
+It is meant to be called by the board_setup class.
+
+A heuristic is a function heuristic(board, state) that returns a lower bound
+on the number of moves needed to win from the state key.
+"""
+
+import heapq
+import time
+from .breadth_search import trace_moves
+from ..classes.solver_result import SolverResult
+from ..classes.solver_stats import SolverStats
+from ..classes.budget import Budget
+
+def blocking_heuristic(board, state):
+    """
+    Counts the vehicles between the red car and the exit, plus one for the red car itself.
+    Every blocking vehicle has to move at least once before the red car can leave.
+    """
+    red_index = board.vehicle_indices['X']
+    red_car = board.vehicles_list[red_index]
+    red_end = state[red_index] + red_car.length - 1
+    if red_end == board.exit[1]:
+        return 0
+
+    red_row = red_car.positions[0][1]
+    blockers = 0
+    for index, vehicle in enumerate(board.vehicles_list):
+        if vehicle.orientation == 'V':
+            # Vertical vehicles in a column right of the red car that cover its row
+            if vehicle.positions[0][0] > red_end and state[index] <= red_row < state[index] + vehicle.length:
+                blockers += 1
+        elif index != red_index and vehicle.positions[0][1] == red_row and state[index] > red_end:
+            blockers += 1
+    return blockers + 1
+
+def exit_distance_heuristic(board, state):
+    """
+    Uses the distance of the red car to the exit.
+    The red car can slide the whole distance in one move, so this is at most one.
+    """
+    red_index = board.vehicle_indices['X']
+    distance = board.exit[1] - (state[red_index] + board.vehicles_list[red_index].length - 1)
+    return min(distance, 1)
+
+heuristics = {'blocking': blocking_heuristic, 'exit_distance': exit_distance_heuristic}
+
+def astar(board, heuristic=blocking_heuristic, node_max=None, budget=None):
+    """
+    Searches the states of the board in order of moves made plus the heuristic,
+    starting at its current state. With an admissible heuristic the first
+    winning state taken from the queue gives the shortest solution.
+    The board is restored to its starting state afterwards.
+
+    Parameters:
+    - board (Board): The board to solve.
+    - heuristic (function): heuristic(board, state), a lower bound on the moves left.
+    - node_max (int): Maximum number of states to expand, None for no limit.
+    - budget (Budget): Limits of the search, replaces node_max when given.
+
+    Returns:
+    - SolverResult: The shortest solution and the search metrics.
+    """
+    start_time = time.perf_counter()
+    budget = budget if budget is not None else Budget(node_max)
+    budget.start()
+    stats = SolverStats.start()
+    start = board.get_state()
+    parents = {start: None}
+    best_moves = {start: 0}
+    closed = set()
+
+    # Entries are (moves + heuristic, -moves, state), ties go to the deepest state
+    queue = [(heuristic(board, start), 0, start)]
+    peak_frontier = 1
+    nodes_expanded = 0
+    states_generated = 0
+    duplicates = 0
+    goal = None
+    stopped = None
+
+    while queue:
+        stopped = budget.exceeded(nodes_expanded, len(parents))
+        if stopped:
+            break
+        _, negative_moves, state = heapq.heappop(queue)
+        if state in closed:
+            # An older entry of a state that was reached again in fewer moves
+            duplicates += 1
+            continue
+        if stats:
+            tick = time.perf_counter()
+            won = board.is_won_state(state)
+            stats.goal_time += time.perf_counter() - tick
+        else:
+            won = board.is_won_state(state)
+        if won:
+            goal = state
+            break
+
+        closed.add(state)
+        nodes_expanded += 1
+        moves = 1 - negative_moves
+
+        if stats:
+            # next_states sets the state first, so setting it here splits the update from the generation
+            tick = time.perf_counter()
+            board.set_state(state)
+            tock = time.perf_counter()
+            next_states = board.next_states(state)
+            stats.update_time += tock - tick
+            stats.generate_time += time.perf_counter() - tock
+        else:
+            next_states = board.next_states(state)
+        states_generated += len(next_states)
+
+        for next_state, index, movement in next_states:
+            if next_state in closed or best_moves.get(next_state, moves + 1) <= moves:
+                duplicates += 1
+                continue
+            best_moves[next_state] = moves
+            parents[next_state] = (state, index, movement)
+            heapq.heappush(queue, (moves + heuristic(board, next_state), -moves, next_state))
+
+        peak_frontier = max(peak_frontier, len(queue))
+
+    board.set_state(start)
+    moves = trace_moves(board, parents, goal) if goal is not None else []
+    if stats:
+        stats.finish(states_generated, nodes_expanded, duplicates, peak_frontier, len(parents))
+    return SolverResult('A*', goal is not None, moves, nodes_expanded, peak_frontier, time.perf_counter() - start_time, stopped, stats)
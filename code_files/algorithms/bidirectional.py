@@ -0,0 +1,136 @@
+"""
+Function for the bidirectional breadth-first search algorithm.
+It is meant to be called by the board_setup class.
+
+The forward search runs from the start. The backward side is the perimeter of
+all states that can be won within two moves. Listing the winning states is not
+feasible on larger boards, so the perimeter is not searched backwards state by
+state; instead every expanded state is tested for membership, which is exact and
+only looks at the row of the red car. The searches meet at the first expanded
+state inside the perimeter.
+"""
+
+import time
+from collections import deque
+from .breadth_search import trace_moves
+from ..classes.solver_result import SolverResult
+from ..classes.solver_stats import SolverStats
+from ..classes.budget import Budget
+
+# Number of moves to win from every state in the perimeter, at most
+PERIMETER_DEPTH = 2
+
+def perimeter_moves(board):
+    """
+    Finds the shortest solution from the current state of the board if it takes
+    at most two moves: the red car drives out, or one vertical car leaves the
+    row of the red car and then the red car drives out.
+
+    Parameters:
+    - board (Board): The board in the state to test.
+
+    Returns:
+    - list or None: The moves as (vehicle name, movement) tuples, or None if more moves are needed.
+    """
+    red_car = board.find_vehicle('X')
+    last_col, row = red_car.positions[-1]
+    exit_move = board.exit[1] - last_col
+    if exit_move == 0:
+        return []
+
+    # Vehicles on the cells between the red car and the exit
+    blockers = {board.occupancy[row * board.size + col] - 1 for col in range(last_col + 1, board.size)
+                if board.occupancy[row * board.size + col]}
+    if not blockers:
+        return [('X', exit_move)]
+    if len(blockers) > 1:
+        return None
+
+    # A horizontal car in the row can never leave it
+    vehicle = board.vehicles_list[blockers.pop()]
+    if vehicle.orientation == 'H':
+        return None
+
+    lowest, highest = board.move_range(vehicle)
+    top = vehicle.positions[0][1]
+    up = row - top - vehicle.length
+    down = row - top + 1
+    movements = [movement for movement in (up, down) if lowest <= movement <= highest]
+    if not movements:
+        return None
+    return [(vehicle.name, min(movements, key=abs)), ('X', exit_move)]
+
+def bidirectional_search(board, node_max=None, budget=None):
+    """
+    Searches the states of the board layer by layer from its current state, until
+    it expands a state in the perimeter of states that can be won within two moves.
+    The board is restored to its starting state afterwards.
+
+    The states are expanded in order of moves from the start. A state d moves from
+    the start in the perimeter is at most two moves from winning, and no state closer
+    to the start is, so the solution through it is the shortest. Compared to a
+    breadth-first search the last layers before the winning states are not expanded.
+
+    Parameters:
+    - board (Board): The board to solve.
+    - node_max (int): Maximum number of states to expand, None for no limit.
+    - budget (Budget): Limits of the search, replaces node_max when given.
+
+    Returns:
+    - SolverResult: The shortest solution and the search metrics.
+    """
+    start_time = time.perf_counter()
+    budget = budget if budget is not None else Budget(node_max)
+    budget.start()
+    stats = SolverStats.start()
+    start = board.get_state()
+    parents = {start: None}
+    frontier = deque([start])
+    peak_frontier = 1
+    nodes_expanded = 0
+    states_generated = 0
+    duplicates = 0
+    meet = None
+    stopped = None
+
+    while frontier:
+        stopped = budget.exceeded(nodes_expanded, len(parents))
+        if stopped:
+            break
+        state = frontier.popleft()
+        if stats:
+            tick = time.perf_counter()
+            board.set_state(state)
+            tock = time.perf_counter()
+            moves_left = perimeter_moves(board)
+            stats.update_time += tock - tick
+            stats.goal_time += time.perf_counter() - tock
+        else:
+            board.set_state(state)
+            moves_left = perimeter_moves(board)
+        if moves_left is not None:
+            meet = state
+            break
+
+        nodes_expanded += 1
+        if stats:
+            tick = time.perf_counter()
+            next_states = board.next_states(state)
+            stats.generate_time += time.perf_counter() - tick
+        else:
+            next_states = board.next_states(state)
+        states_generated += len(next_states)
+
+        for next_state, index, movement in next_states:
+            if next_state in parents:
+                duplicates += 1
+                continue
+            parents[next_state] = (state, index, movement)
+            frontier.append(next_state)
+        peak_frontier = max(peak_frontier, len(frontier))
+
+    board.set_state(start)
+    moves = trace_moves(board, parents, meet) + moves_left if meet is not None else []
+    if stats:
+        stats.finish(states_generated, nodes_expanded, duplicates, peak_frontier, len(parents))
+    return SolverResult('Bidirectional', meet is not None, moves, nodes_expanded, peak_frontier, time.perf_counter() - start_time, stopped, stats)
@@ -5,53 +5,99 @@ It is meant to be called by the board_setup class.
 Author: Jaap Osseweijer
 """
 
-def breadth_search(current_layer_boards: list, current_layer_index, former_layer_boards: list, former_layer_index):
+import time
+from collections import deque
+from ..classes.solver_result import SolverResult
+from ..classes.solver_stats import SolverStats
+from ..classes.budget import Budget
+
+def trace_moves(board, parents, state):
     """
-    Cycles through the possible moves of the board, exluding moves that undo the last move
+    Follows the parent table back from a state to the start of the search.
+
+    Parameters:
+    - board (Board): The board the states belong to.
+    - parents (dict): State key -> (parent state key, vehicle index, movement), None for the start.
+    - state (bytes): The state to trace back from.
+
+    Returns:
+    - list: The moves from the start to the state as (vehicle name, movement) tuples.
     """
+    moves = []
+    while parents[state] is not None:
+        state, index, movement = parents[state]
+        moves.append((board.vehicles_list[index].name, movement))
+    moves.reverse()
+    return moves
+
+def breadth_search(board, node_max=None, budget=None):
+    """
+    Searches the states of the board layer by layer, starting at its current state.
+    Every state is only expanded once, so the first solution found is the shortest.
+    The board is restored to its starting state afterwards.
+
+    Parameters:
+    - board (Board): The board to solve.
+    - node_max (int): Maximum number of states to expand, None for no limit.
+    - budget (Budget): Limits of the search, replaces node_max when given.
+
+    Returns:
+    - SolverResult: The shortest solution and the search metrics.
+    """
+    start_time = time.perf_counter()
+    budget = budget if budget is not None else Budget(node_max)
+    budget.start()
+    stats = SolverStats.start()
+    start = board.get_state()
+    parents = {start: None}
+    frontier = deque([start])
+    peak_frontier = 1
+    nodes_expanded = 0
+    states_generated = 0
+    duplicates = 0
+    goal = start if board.is_won_state(start) else None
+    stopped = None
+
+    while goal is None and frontier:
+        stopped = budget.exceeded(nodes_expanded, len(parents))
+        if stopped:
+            break
+        state = frontier.popleft()
+        nodes_expanded += 1
+
+        if stats:
+            # next_states sets the state first, so setting it here splits the update from the generation
+            tick = time.perf_counter()
+            board.set_state(state)
+            tock = time.perf_counter()
+            next_states = board.next_states(state)
+            stats.update_time += tock - tick
+            stats.generate_time += time.perf_counter() - tock
+        else:
+            next_states = board.next_states(state)
+        states_generated += len(next_states)
+
+        for next_state, index, movement in next_states:
+            if next_state in parents:
+                duplicates += 1
+                continue
+            parents[next_state] = (state, index, movement)
+
+            if stats:
+                tick = time.perf_counter()
+                won = board.is_won_state(next_state)
+                stats.goal_time += time.perf_counter() - tick
+            else:
+                won = board.is_won_state(next_state)
+            if won:
+                goal = next_state
+                break
+            frontier.append(next_state)
+
+        peak_frontier = max(peak_frontier, len(frontier))
 
-    if current_layer_index != None and current_layer_index < 0:
-        current_layer_index = None
-        former_layer_index += 1
-
-    if former_layer_index == len(former_layer_boards):
-        former_layer_boards.clear()
-        former_layer_boards = current_layer_boards[:]
-        former_layer_index = 0
-        current_layer_index = None
-        current_layer_boards.clear()
-
-
-    board = former_layer_boards[former_layer_index][0]
-
-    options = []
-    # For each vehicle on the board, check if it can move
-    for vehicle in board.vehicles_list:
-
-        for direction in [-1, 1]:
-            move = 1
-            stuck = False
-            
-            while move < board.size and not stuck:
-                try:
-                    if not (vehicle.name == former_layer_boards[former_layer_index][1][0] and (move*direction) == -former_layer_boards[former_layer_index][1][1]):
-                        new_positions = board.move_piece(vehicle.name, move * direction)
-                        options.append((vehicle.name, (move * direction, new_positions)))
-                    move += 1
-
-                except ValueError:
-                    stuck = True
-                
-    if len(options) == 0:
-        raise ValueError("No possible moves found")
-    
-    # Select a random vehicle and a random move
-    if current_layer_index == None:
-        current_layer_index = len(options)
-
-    if current_layer_index >= 0:
-        current_layer_index -= 1
-        vehicle = options[current_layer_index][0]
-        movement, position = options[current_layer_index][1]
-
-    return vehicle, movement, position, current_layer_boards, current_layer_index, former_layer_boards, former_layer_index
+    board.set_state(start)
+    moves = trace_moves(board, parents, goal) if goal is not None else []
+    if stats:
+        stats.finish(states_generated, nodes_expanded, duplicates, peak_frontier, len(parents))
+    return SolverResult('Breadth-first', goal is not None, moves, nodes_expanded, peak_frontier, time.perf_counter() - start_time, stopped, stats)
@@ -21,24 +21,11 @@ def depth_search(board, history: Stack, made_moves, bottom):
     if history.size() <= bottom:
         options = {}
         # For each vehicle on the board, check if it can move
-        for vehicle in board.vehicles_list:
-            possible_moves = []
+        for vehicle, lowest, highest in board.move_ranges():
+            possible_moves = [move for move in range(lowest, highest + 1) if move != 0]
 
-            for direction in [-1, 1]:
-                move = 1
-                stuck = False
-                
-                while move < board.size and not stuck:
-                    try:
-                        new_positions = board.move_piece(vehicle.name, move * direction)
-                        possible_moves.append((move * direction, new_positions))
-                        move += 1
-
-                    except ValueError:
-                        stuck = True
-                
-                if possible_moves:
-                    options[vehicle.name] = possible_moves
+            if possible_moves:
+                options[vehicle.name] = possible_moves
                     
         if len(options) == 0:
             raise ValueError("No possible moves found")
@@ -46,17 +33,18 @@ def depth_search(board, history: Stack, made_moves, bottom):
         # Select a random vehicle and a random move
         while not new_move and len(options) != 0:
             vehicle = random.choice(list(options.keys()))
-            movement, position = random.choice(options[vehicle])
+            movement = random.choice(options[vehicle])
+            position = board.find_vehicle(vehicle).moved_positions(movement)
             new_move = True
 
             if vehicle in made_moves:
                 if history.size() in made_moves[vehicle]:
                     for made_move in made_moves[vehicle][history.size()][0]:
                         if made_move == (movement, position):
-                            options[vehicle].remove((movement, position))
+                            options[vehicle].remove(movement)
                             new_move = False
                         elif movement == -last_move[1] and vehicle == last_move[0] and new_move:
-                            options[vehicle].remove((movement, position))
+                            options[vehicle].remove(movement)
                             new_move = False                        
             
             if len(options[vehicle]) == 0:
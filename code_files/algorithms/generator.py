@@ -4,10 +4,9 @@ These are meant to be called by the board class.
 
 Author: Nanne Hempel
 """
-import numpy as np
 import random
-import pandas as pd
 import string
+from functools import lru_cache
 
 def generate_car_names(num_cars):
     letters = list(string.ascii_uppercase)
@@ -26,49 +25,203 @@ def generate_car_names(num_cars):
     return car_list
 
 
-def place_car(car, col, row, orientation, length, direction, position_array, x_col, x_row):
+def car_cells(col, row, orientation, length, size):
     """
-    Places a car on the board.
-    Will only place a car if it fits on the board.
+    Returns the cells of a car as row-major indices.
 
     Parameters
     ----------
-        car str : Name of the car.
-        col int : Column number.
-        row int : Row number.
+        col int : Column of the top left cell of the car.
+        row int : Row of the top left cell of the car.
         orientation str : Orientation of the car, either 'H' or 'V'.
         length int : Length of the car.
-        direction int : Direction of the car, either -1 or 1.
-        position_array np.array : Array representing the board.
+        size int : Size of the board.
+    """
+    if orientation == 'H':
+        return range(row * size + col, row * size + col + length)
+    return range(row * size + col, (row + length) * size + col, size)
+
+@lru_cache(maxsize=None)
+def covering_slots(size):
+    """
+    Lists for every cell the top left cells of the cars that would cover it.
+
+    Parameters
+    ----------
+        size int : Size of the board.
 
     Returns
     -------
-        position_array np.array : Array representing the board. With new car placed.
+        covering dict : (orientation, length) -> list with per cell the top left cells.
+    """
+    covering = {}
+    for orientation in ('H', 'V'):
+        for length in (2, 3):
+            covering[(orientation, length)] = [[cell - shift if orientation == 'H' else cell - shift * size
+                                                for shift in range(length)
+                                                if (cell % size if orientation == 'H' else cell // size) >= shift]
+                                               for cell in range(size * size)]
+    return covering
 
+def free_slots(occupancy, size, orientation, length, line_lengths, lock_limit, x_col, x_row):
     """
-    size = position_array.shape[0]
-    path = length * direction
-    # Horizontal cars can only be placed left of the red car
-    if orientation == 'H' and row == x_row:
-        between_x_and_exit = (col + path + 1) >= x_col + 2 if direction == -1 else (col) >= x_col + 2
-        if between_x_and_exit:
-            raise ValueError("Car cannot be placed between X and exit")
-        
+    Finds the top left cells where a car can be placed.
+    A car fits where all its cells are free, does not stand between X and the exit,
+    and does not lock its row or column.
 
-    if orientation == 'H':
-        start, stop = (col+path+1, col+1) if direction == -1 else (col, col+path)
-        in_bounds = start >= 0 if direction == -1 else stop <= size
-        new_positions = position_array[row, start:stop]
-    elif orientation == 'V':
-        start, stop = (row+path+1, row+1) if direction == -1 else (row, row+path)
-        in_bounds = start >= 0 if direction == -1 else stop <= size
-        new_positions = position_array[start:stop, col]
-
-    if np.core.defchararray.equal(new_positions, ' ').all() and not np.core.defchararray.equal(new_positions, 'X').any() and in_bounds:
-        new_positions[:] = car
-        return position_array
-    else:
-        raise ValueError("Car does not fit on the board")
+    Parameters
+    ----------
+        occupancy bytearray : Row-major cells of the board, 1 if occupied.
+        size int : Size of the board.
+        orientation str : Orientation of the car, either 'H' or 'V'.
+        length int : Length of the car.
+        line_lengths list : Total length of the cars in line with the orientation,
+        per row for horizontal cars and per column for vertical cars.
+        lock_limit int : Minimum number of open spaces in column or row.
+
+    Returns
+    -------
+        slots dict : The free cells as keys, a dict keeps them in order and removes them in constant time.
+    """
+    slots = {}
+    for row in range(size - (length - 1 if orientation == 'V' else 0)):
+        for col in range(size - (length - 1 if orientation == 'H' else 0)):
+            # Horizontal cars can only be placed left of the red car
+            if orientation == 'H' and row == x_row and col >= x_col + 2:
+                continue
+            if line_lengths[row if orientation == 'H' else col] + length >= size - lock_limit:
+                continue
+            if not any(occupancy[cell] for cell in car_cells(col, row, orientation, length, size)):
+                slots[row * size + col] = None
+    return slots
+
+@lru_cache(maxsize=None)
+def start_slots(size, lock_limit, x_col, x_row):
+    """
+    Finds the free slots of a board with only X on it, for every kind of car.
+    The slots must be copied before they are changed.
+
+    Returns
+    -------
+        slots dict : (orientation, length) -> free slots, from free_slots.
+    """
+    occupancy = bytearray(size * size)
+    occupancy[x_row * size + x_col:x_row * size + x_col + 2] = b'\x01\x01'
+    return {(orientation, length): free_slots(occupancy, size, orientation, length, [0] * size, lock_limit, x_col, x_row)
+            for orientation in ('H', 'V') for length in (2, 3)}
+
+def board_frame(records):
+    """
+    Builds the DataFrame of a board from its cars.
+
+    Parameters
+    ----------
+        records list : (name, orientation, col, row, length) of every car, 1-indexed.
+
+    Returns
+    -------
+        initial_state pd.DataFrame : Initial state of the board.
+        can be used to fill the board class with .set_board()
+    """
+    import pandas as pd
+
+    names = [record[0] for record in records]
+    return pd.DataFrame([record[1:] for record in records], columns=['orientation', 'col', 'row', 'length'], index=pd.Index(names, name='car'))
+
+def random_board_records(size, num_cars, car_truck_ratio, lock_limit, exit_distance, HV_ratio=(1,1), car_names=None):
+    """
+    Generates the cars of a random board, without building a DataFrame.
+
+    Parameters
+    ----------
+        The same as random_board.
+        car_names list : Names of the cars other than X, from generate_car_names.
+
+    Returns
+    -------
+        records list : (name, orientation, col, row, length) of every car, 1-indexed,
+        in the order of the DataFrame of random_board.
+    """
+    if car_names is None:
+        car_names = generate_car_names(num_cars)
+
+    # Car parameters
+    orientations = ['H' for _ in range(HV_ratio[0])] + ['V' for _ in range(HV_ratio[1])]
+    lengths = [2 for _ in range(car_truck_ratio[0])] + [3 for _ in range(car_truck_ratio[1])]
+
+    x_row = random.choice(range(1, size - 2))
+    x_col = random.choice(range(1, size - exit_distance - 1))
+
+    # Drawing a kind of car in proportion to its ratio times the number of free slots for it
+    # gives the same boards as trying random cells until a car fits
+    kinds = [(orientation, length) for orientation in ('H', 'V') for length in (2, 3)
+             if orientation in orientations and length in lengths]
+    ratios = [orientations.count(orientation) * lengths.count(length) for orientation, length in kinds]
+
+    covering = covering_slots(size)
+    empty_slots = start_slots(size, lock_limit, x_col, x_row)
+    empty = bytearray(size * size)
+    empty[x_row * size + x_col:x_row * size + x_col + 2] = b'\x01\x01'
+
+    best = []
+    for _ in range(100):
+        # Integer occupancy of the board, 1 where a car is
+        occupancy = bytearray(empty)
+        records = []
+
+        # Arrays that keep track of the cars that are placed
+        # If a row or column is full, and all cars are in-line,
+        # that row or column is locked. Slots that would lock them are left out.
+        row_horizontals = [0] * size
+        col_verticals = [0] * size
+        slots = {kind: empty_slots[kind].copy() for kind in kinds}
+
+        while len(records) < num_cars - 1:
+            weights = [ratio * len(slots[kind]) for kind, ratio in zip(kinds, ratios)]
+            if not any(weights):
+                break
+            orientation, length = random.choices(kinds, weights)[0]
+            start = random.choice(list(slots[(orientation, length)]))
+            row, col = divmod(start, size)
+            cells = car_cells(col, row, orientation, length, size)
+            for cell in cells:
+                occupancy[cell] = 1
+            records.append((car_names[len(records)], orientation, col + 1, row + 1, length))
+
+            # Remove the slots of cars that would overlap the new car
+            for kind in kinds:
+                kind_slots = slots[kind]
+                for cell in cells:
+                    for slot in covering[kind][cell]:
+                        kind_slots.pop(slot, None)
+
+            ## This can be set as a difficulty parameter
+            # Remove the slots of cars that would lock the row or column
+            if orientation == 'H':
+                row_horizontals[row] += length
+                for kind in kinds:
+                    if kind[0] == 'H' and row_horizontals[row] + kind[1] >= size - lock_limit:
+                        for cell in range(row * size, (row + 1) * size):
+                            slots[kind].pop(cell, None)
+            else:
+                col_verticals[col] += length
+                for kind in kinds:
+                    if kind[0] == 'V' and col_verticals[col] + kind[1] >= size - lock_limit:
+                        for cell in range(col, size * size, size):
+                            slots[kind].pop(cell, None)
+
+        if len(records) > len(best):
+            best = records
+        if len(best) == num_cars - 1:
+            break
+
+    # No place was left for a car, in all attempts
+    if len(best) < num_cars - 1:
+        print("Could not place all cars on the board")
+
+    records = best
+    records.append(('X', 'H', x_col + 1, x_row + 1, 2))
+    return records
 
 def random_board(size, num_cars, car_truck_ratio, lock_limit, exit_distance, HV_ratio=(1,1)):
     """
@@ -87,113 +240,76 @@ def random_board(size, num_cars, car_truck_ratio, lock_limit, exit_distance, HV_
         initial_state pd.DataFrame : Initial state of the board.
         can be used to fill the board class with .set_board()
     """
+    return board_frame(random_board_records(size, num_cars, car_truck_ratio, lock_limit, exit_distance, HV_ratio))
 
-    # Create an empty array to keep track of the board
-    position_array = np.array([[' '] * size] * size, dtype=str)
-    index = np.arange(size)
-    x_row = random.choice(range(1, size - 2))
-    x_col = random.choice(range(1, size - exit_distance - 1))
-    position_array[x_row, x_col:x_col+2] = 'X'
+def random_boards(count, size, num_cars, car_truck_ratio, lock_limit, exit_distance, HV_ratio=(1,1), frames=True):
+    """
+    Generates a batch of random boards.
 
-    # Create a list of car names excluding 'X'
+    Parameters
+    ----------
+        count int : Number of boards.
+        The other parameters are the same as random_board.
+        frames bool : Return DataFrames, or the records of random_board_records when False.
+
+    Returns
+    -------
+        boards list : The boards.
+    """
     car_names = generate_car_names(num_cars)
+    boards = [random_board_records(size, num_cars, car_truck_ratio, lock_limit, exit_distance, HV_ratio, car_names) for _ in range(count)]
+    return [board_frame(records) for records in boards] if frames else boards
 
-    initial_state = pd.DataFrame(columns=['orientation', 'col', 'row', 'length'], index=pd.Index(car_names, name='car'))
-    initial_state.loc['X'] = ['H', x_col, x_row, 2]
+def solvable_board(size, num_cars, car_truck_ratio, lock_limit, exit_distance, HV_ratio=(1,1), min_optimal=1, max_optimal=None, state_max=20000, attempts=100):
+    """
+    Generates a board that can be won, with a shortest solution between
+    min_optimal and max_optimal moves.
 
-    # Arrays that keep track of the cars that are placed
-    # If a row or column is full, and all cars are in-line,
-    # that row or column is locked. And a new board should be generated.
-    row_horizontals = np.zeros(size, dtype=int)
-    col_verticals = np.zeros(size, dtype=int)
+    A random layout is generated and all states it can reach are enumerated,
+    with their distance to a winning state found by searching backwards from
+    the winning states. A random state at a distance in the range becomes the
+    start of the board. Layouts without such a state are replaced by new ones.
 
-    # Car parameters
-    directions = [-1, 1]
-    orientations = ['H' for _ in range(HV_ratio[0])] + ['V' for _ in range(HV_ratio[1])]
-    lengths = [2 for _ in range(car_truck_ratio[0])] + [3 for _ in range(car_truck_ratio[1])]
+    Parameters
+    ----------
+        The first parameters are the same as random_board.
+        min_optimal int : Minimum number of moves of the shortest solution.
+        max_optimal int : Maximum number of moves of the shortest solution, None for no limit.
+        state_max int : Maximum number of states of a layout, larger layouts are skipped.
+        attempts int : Maximum number of layouts to generate.
 
-    placed = 0
-    errors = 0
-
-    while placed < num_cars - 1 and errors < 100000:
-        name = car_names[placed]
-        column = random.choice(index)
-        row = random.choice(index)
-        orientation = random.choice(orientations)
-        length = random.choice(lengths)
-        direction = random.choice(directions)
-        
-        try:
-            position_array = place_car(name, column, row, orientation, length, direction, position_array, x_col, x_row)
-            if direction == 1:
-                initial_state.loc[name] = [orientation, column, row, length]
-            elif direction == -1:
-                initial_state.loc[name] = [orientation, column - length + 1, row, length] if orientation == 'H' \
-                                     else [orientation, column, row - length + 1, length]
-            placed += 1
-            errors = 0
-            
-            if orientation == 'H':
-                row_horizontals[row] += length
-            elif orientation == 'V':
-                col_verticals[column] += length
+    Returns
+    -------
+        initial_state pd.DataFrame : Initial state of the board.
+        optimal_moves int : Number of moves of the shortest solution.
 
-            ## This can be set as a difficulty parameter
-            locked_rows = np.any(row_horizontals >= size - lock_limit)
-            locked_cols = np.any(col_verticals >= size - lock_limit)
-
-            if locked_rows or locked_cols:
-                position_array = np.array([[' '] * size] * size, dtype=str)
-                row_horizontals = np.zeros(size, dtype=int)
-                col_verticals = np.zeros(size, dtype=int)
-                position_array[x_row, x_col:x_col+2] = 'X'
-                initial_state.loc['X'] = ['H', x_col, x_row, 2]
-                placed = 0
-                continue
+    Raises
+    ------
+        ValueError : If no board was found within attempts.
+    """
+    # The board module imports this module, so these are imported here
+    from ..classes.board_setup import Board
+    from .retrograde import retrograde_distances
 
+    car_names = generate_car_names(num_cars)
+    for _ in range(attempts):
+        board = Board(size)
+        board.setup_board(board_frame(random_board_records(size, num_cars, car_truck_ratio, lock_limit, exit_distance, HV_ratio, car_names)))
+        try:
+            distances, _ = retrograde_distances(board, state_max)
         except ValueError:
-            errors += 1
             continue
 
-    if errors == 100000:
-        print("Could not place all cars on the board")
+        # Sorted, because the order of a set of bytes differs between processes
+        states = sorted(state for state, distance in distances.items()
+                        if distance >= min_optimal and (max_optimal is None or distance <= max_optimal))
+        if not states:
+            continue
 
-    # Add 1 to the column and row numbers to make it human readable
-    initial_state['col'] += 1
-    initial_state['row'] += 1
-    return initial_state.dropna()
-
-def random_step(board):
-    """
-    Randomly select a step that is valid.
-    """
-    options = {}
-    # For each vehicle on the board, check if it can move
-    for vehicle in board.vehicles_list:
-        possible_moves = []
-
-        for direction in [-1, 1]:
-            move = 1
-            stuck = False
-            
-            while move < board.size and not stuck:
-                try:
-                    new_positions = board.move_piece(vehicle.name, move * direction)
-                    possible_moves.append((move * direction, new_positions))
-                    move += 1
-
-                except ValueError:
-                    stuck = True
-            
-            if possible_moves:
-                options[vehicle.name] = possible_moves
-                
-    if len(options) == 0:
-        raise ValueError("No possible moves found")
-    
-    # Select a random vehicle and a random move
-    vehicle = random.choice(list(options.keys()))
-    movement, position = random.choice(options[vehicle])
-
-    return vehicle, movement, position
+        state = random.choice(states)
+        board.set_state(state)
+        records = [(vehicle.name, vehicle.orientation, vehicle.positions[0][0] + 1, vehicle.positions[0][1] + 1, vehicle.length)
+                   for vehicle in board.vehicles_list]
+        return board_frame(records), distances[state]
 
+    raise ValueError(f"No board with a solution of {min_optimal} to {max_optimal} moves found in {attempts} attempts")
@@ -0,0 +1,262 @@
+"""
+Function for the iterative deepening A* (IDA*) search algorithm.
+It is meant to be called by the board_setup class.
+
+The search makes and unmakes moves on the board itself and only keeps the
+current path, plus a transposition table of a fixed number of slots.
+"""
+
+import math
+import time
+import zlib
+from .astar import blocking_heuristic
+from ..classes.solver_result import SolverResult
+from ..classes.solver_stats import SolverStats
+from ..classes.budget import Budget
+
+FOUND = -1
+# Slots of the transposition table a state can be stored in
+BUCKET_SLOTS = 4
+
+def encode_ranges(move_ranges):
+    """Packs the move ranges of a state into bytes, the lowest and highest movement of every vehicle in turn."""
+    return bytes(value for _, lowest, highest in move_ranges for value in (-lowest, highest))
+
+def ida_star(board, heuristic=blocking_heuristic, node_max=None, table_size=1 << 18, budget=None):
+    """
+    Runs depth-first searches from the current state of the board, cutting off
+    every path where moves made plus the heuristic exceed a bound. The bound
+    starts at the heuristic of the start and is raised to the lowest cut off
+    value after every search, so the first solution found is the shortest.
+    The board is restored to its starting state afterwards.
+
+    States are stored in a transposition table of table_size slots, with the
+    moves left they were found to need at least: the lowest cut off value
+    below them minus their moves. Entries are kept over the iterations, so a
+    state whose learned moves left exceed the bound is cut without searching
+    its subtree again. A state that was already searched in the current
+    iteration with at most as many moves is not searched again. Every state
+    has a bucket of four slots, a new state takes an empty slot, otherwise it
+    overwrites an entry of an older iteration, or else the entry furthest
+    from the start if it is closer to the start itself.
+
+    Parameters:
+    - board (Board): The board to solve.
+    - heuristic (function): heuristic(board, state), a lower bound on the moves left.
+    - node_max (int): Maximum number of states to expand over all iterations, None for no limit.
+    - table_size (int): Number of slots in the transposition table, in buckets of four.
+    - budget (Budget): Limits of the search, replaces node_max when given. The
+      states in memory are the states on the current path.
+
+    Returns:
+    - SolverResult: The shortest solution and the search metrics, the peak
+      frontier is the deepest path that was searched.
+    """
+    start_time = time.perf_counter()
+    budget = budget if budget is not None else Budget(node_max)
+    budget.start()
+    stats = SolverStats.start()
+    start = board.get_state()
+    state = bytearray(start)
+    buckets = max(table_size // BUCKET_SLOTS, 1)
+    table = [None] * (BUCKET_SLOTS * buckets)
+    vehicles = board.vehicles_list
+    path = []
+    nodes_expanded = 0
+    states_generated = 0
+    duplicates = 0
+    peak_depth = 0
+    stopped = None
+    unseen_cut = False
+
+    def find(key, bound):
+        """
+        Returns the slot of a state in the transposition table and its entry. A state
+        that is not stored gets None and the slot of its bucket that it may replace:
+        an empty one, else one of an older iteration, else the one furthest from the start.
+        """
+        # CRC is linear, so states that differ in the same way share its low bits,
+        # taking the middle bits of a multiple spreads them over the buckets
+        first = (zlib.crc32(key) * 0x9E3779B1 >> 16) % buckets * BUCKET_SLOTS
+        bucket = table[first:first + BUCKET_SLOTS]
+        for slot, entry in enumerate(bucket, first):
+            if entry is not None and entry[0] == key:
+                return slot, entry
+        if None in bucket:
+            return first + bucket.index(None), None
+        ranks = [(entry[2] != bound, entry[1]) for entry in bucket]
+        return first + ranks.index(max(ranks)), None
+
+    def store(slot, key, moves, bound, remaining, ranges):
+        """Stores a state in a slot that is empty, holds the same state, an older iteration or a state further from the start."""
+        entry = table[slot]
+        if entry is None or entry[0] == key or entry[2] != bound or moves <= entry[1]:
+            table[slot] = (key, moves, bound, remaining, ranges)
+
+    def probe(moves, bound):
+        """
+        Looks up the current state before a move is made on the board, the heuristic
+        and the goal test only read the state key. Returns the cut off value and the
+        moves needed at least of a state that is not searched, otherwise None and its
+        key, slot and moves left.
+        """
+        nonlocal duplicates, unseen_cut
+        key = bytes(state)
+        slot, entry = find(key, bound)
+        if entry is not None:
+            if entry[2] == bound and entry[1] <= moves:
+                # Its cut offs are found where it was searched with more of the bound left
+                duplicates += 1
+                return (math.inf, moves + entry[3]), None
+            remaining = entry[3]
+        else:
+            remaining = heuristic(board, state)
+            unseen_cut = unseen_cut or moves + remaining > bound
+        if moves + remaining > bound:
+            return (moves + remaining, moves + remaining), None
+        return None, (key, slot, remaining)
+
+    def search(moves, last_index, bound, key, slot, remaining):
+        """
+        Searches below the current state. Returns FOUND, or the lowest cut off value,
+        the next bound, and the lowest number of moves a path through it needs at least.
+        """
+        nonlocal nodes_expanded, states_generated, peak_depth, stopped
+        if stats:
+            tick = time.perf_counter()
+            won = board.is_won_state(state)
+            stats.goal_time += time.perf_counter() - tick
+        else:
+            won = board.is_won_state(state)
+        if won:
+            return FOUND
+        stopped = budget.exceeded(nodes_expanded, moves)
+        if stopped:
+            return math.inf, math.inf
+
+        # States are expanded again in every iteration, so their move ranges are kept in the table
+        entry = table[slot]
+        if entry is not None and entry[0] == key:
+            ranges = entry[4]
+        elif stats:
+            tick = time.perf_counter()
+            ranges = encode_ranges(board.move_ranges())
+            stats.generate_time += time.perf_counter() - tick
+        else:
+            ranges = encode_ranges(board.move_ranges())
+        store(slot, key, moves, bound, remaining, ranges)
+
+        nodes_expanded += 1
+        peak_depth = max(peak_depth, moves)
+        lowest_cut_off = lowest_needed = math.inf
+
+        for index, vehicle in enumerate(vehicles):
+            # Moving the same vehicle twice in a row is never shorter than one move
+            if index == last_index:
+                continue
+            lowest, highest = -ranges[2 * index], ranges[2 * index + 1]
+            if lowest == highest:
+                continue
+            for movement in range(lowest, highest + 1):
+                if not movement:
+                    continue
+                states_generated += 1
+                state[index] += movement
+                result, child = probe(moves + 1, bound)
+
+                if result is None:
+                    # Make the move
+                    if stats:
+                        tick = time.perf_counter()
+                        board.update_positions_set(vehicle, vehicle.moved_positions(movement))
+                        stats.update_time += time.perf_counter() - tick
+                    else:
+                        board.update_positions_set(vehicle, vehicle.moved_positions(movement))
+                    path.append((vehicle.name, movement))
+
+                    result = search(moves + 1, index, bound, *child)
+                    if result == FOUND:
+                        return FOUND
+
+                    # Unmake the move
+                    path.pop()
+                    if stats:
+                        tick = time.perf_counter()
+                        board.update_positions_set(vehicle, vehicle.moved_positions(-movement))
+                        stats.update_time += time.perf_counter() - tick
+                    else:
+                        board.update_positions_set(vehicle, vehicle.moved_positions(-movement))
+
+                state[index] -= movement
+                if stopped:
+                    return math.inf, math.inf
+                cut_off, needed = result
+                if cut_off < lowest_cut_off:
+                    lowest_cut_off = cut_off
+                if needed < lowest_needed:
+                    lowest_needed = needed
+
+        # Moves of the vehicle that was just moved were skipped here, but not when the state is
+        # reached by another move, so they count with what is known about the state they lead to
+        if last_index is not None and lowest_needed - moves > remaining:
+            for movement in range(-ranges[2 * last_index], ranges[2 * last_index + 1] + 1):
+                if not movement:
+                    continue
+                state[last_index] += movement
+                lowest_needed = min(lowest_needed, moves + 1 + known_remaining(bound))
+                state[last_index] -= movement
+
+        # Learn the moves left of the state, its slot may have been taken by a state below it
+        if lowest_needed - moves > remaining:
+            store(find(key, bound)[0], key, moves, bound, lowest_needed - moves, ranges)
+        return lowest_cut_off, lowest_needed
+
+    def known_remaining(bound):
+        """Returns the learned moves left of the current state, or its heuristic if it is not in the table."""
+        entry = find(bytes(state), bound)[1]
+        return entry[3] if entry is not None else heuristic(board, state)
+
+    def closed():
+        """
+        Checks whether every move from a state in the table leads to a state in the table.
+        Only searched states that are not won are stored, so then the board cannot be won.
+        """
+        if find(start, bound)[1] is None:
+            return False
+        for entry in table:
+            if entry is None:
+                continue
+            key, ranges = entry[0], entry[4]
+            child = bytearray(key)
+            for index in range(len(vehicles)):
+                for movement in range(-ranges[2 * index], ranges[2 * index + 1] + 1):
+                    if not movement:
+                        continue
+                    child[index] += movement
+                    stored = find(bytes(child), bound)[1] is not None
+                    child[index] -= movement
+                    if not stored:
+                        return False
+        return True
+
+    bound = heuristic(board, state)
+    result = math.inf
+    while not stopped:
+        unseen_cut = False
+        result, root = probe(0, bound)
+        if result is None:
+            result = search(0, None, bound, *root)
+        if result == FOUND or result[0] == math.inf:
+            break
+        # Learned moves left keep growing on boards that cannot be won, so they are
+        # checked for new states once a search only cut off states it had seen before
+        if not unseen_cut and closed():
+            break
+        bound = result[0]
+
+    board.set_state(start)
+    solved = result == FOUND
+    if stats:
+        # The states stored are the filled slots of the transposition table
+        stats.finish(states_generated, nodes_expanded, duplicates, peak_depth, len(table) - table.count(None))
+    return SolverResult('IDA*', solved, path if solved else [], nodes_expanded, peak_depth, time.perf_counter() - start_time, stopped, stats)
@@ -13,31 +13,18 @@ def random_without_reverse(board, last_move):
     options = {}
 
     # For each vehicle on the board, check if it can move
-    for vehicle in board.vehicles_list:
-        possible_moves = []
+    for vehicle, lowest, highest in board.move_ranges():
+        possible_moves = [move for move in range(lowest, highest + 1)
+                          if move != 0 and not (vehicle.name == last_move[0] and move == -last_move[1])]
 
-        for direction in [-1, 1]:
-            move = 1
-            stuck = False
-            
-            while move < board.size and not stuck:
-                try:
-                    if not (vehicle.name == last_move[0] and (move*direction) == -last_move[1]):
-                        new_positions = board.move_piece(vehicle.name, move * direction)
-                        possible_moves.append((move * direction, new_positions))
-                    move += 1
-
-                except ValueError:
-                    stuck = True
-            
-            if possible_moves:
-                options[vehicle.name] = possible_moves
+        if possible_moves:
+            options[vehicle] = possible_moves
                 
     if len(options) == 0:
         raise ValueError("No possible moves found")
     
     # Select a random vehicle and a random move
     vehicle = random.choice(list(options.keys()))
-    movement, position = random.choice(options[vehicle])
+    movement = random.choice(options[vehicle])
 
-    return vehicle, movement, position
+    return vehicle.name, movement, vehicle.moved_positions(movement)
@@ -14,31 +14,17 @@ def random_step(board):
     options = {}
 
     # For each vehicle on the board, check if it can move
-    for vehicle in board.vehicles_list:
-        possible_moves = []
-
-        for direction in [-1, 1]:
-            move = 1
-            stuck = False
-            
-            while move < board.size and not stuck:
-                try:
-                    new_positions = board.move_piece(vehicle.name, move * direction)
-                    possible_moves.append((move * direction, new_positions))
-                    move += 1
-
-                except ValueError:
-                    stuck = True
-            
-            if possible_moves:
-                options[vehicle.name] = possible_moves
+    for vehicle, lowest, highest in board.move_ranges():
+        if lowest or highest:
+            options[vehicle] = (lowest, highest)
                 
     if len(options) == 0:
         raise ValueError("No possible moves found")
     
     # Select a random vehicle and a random move
     vehicle = random.choice(list(options.keys()))
-    movement, position = random.choice(options[vehicle])
+    lowest, highest = options[vehicle]
+    movement = random.choice([move for move in range(lowest, highest + 1) if move != 0])
 
-    return vehicle, movement, position
+    return vehicle.name, movement, vehicle.moved_positions(movement)
 
@@ -0,0 +1,68 @@
+"""
+Functions to enumerate all states a board can reach and their exact
+distance to a winning state.
+
+The distances are found with a breadth-first search backwards from all
+winning states at once (retrograde analysis).
+"""
+
+from collections import deque
+
+def state_space(board, node_max=None):
+    """
+    Lists every state that can be reached from the current state of the board.
+    The board is restored to its starting state afterwards.
+
+    Parameters:
+    - board (Board): The board in its starting state.
+    - node_max (int): Raise a ValueError when there are more states than this, None for no limit.
+
+    Returns:
+    - set: The state keys of all reachable states, including the start.
+    """
+    start = board.get_state()
+    states = {start}
+    queue = deque([start])
+
+    while queue:
+        state = queue.popleft()
+        for next_state, _, _ in board.next_states(state):
+            if next_state not in states:
+                states.add(next_state)
+                queue.append(next_state)
+        if node_max is not None and len(states) > node_max:
+            board.set_state(start)
+            raise ValueError(f"State space is larger than {node_max} states")
+
+    board.set_state(start)
+    return states
+
+def retrograde_distances(board, node_max=None):
+    """
+    Finds the number of moves to win from every state the board can reach.
+    States from which the game cannot be won are left out.
+    The board is restored to its starting state afterwards.
+
+    Parameters:
+    - board (Board): The board in its starting state.
+    - node_max (int): Raise a ValueError when there are more states than this, None for no limit.
+
+    Returns:
+    - tuple: (distances, states), a dict of state key -> moves to win and the set of all reachable states.
+    """
+    start = board.get_state()
+    states = state_space(board, node_max)
+
+    # Moves can always be undone, so searching from the winning states finds the distance to them
+    distances = {state: 0 for state in states if board.is_won_state(state)}
+    queue = deque(distances)
+    while queue:
+        state = queue.popleft()
+        distance = distances[state] + 1
+        for next_state, _, _ in board.next_states(state):
+            if next_state not in distances:
+                distances[next_state] = distance
+                queue.append(next_state)
+
+    board.set_state(start)
+    return distances, states
@@ -0,0 +1,33 @@
+"""
+The search algorithms that return a SolverResult, by their names in the experiments.
+All of them find a shortest solution, so their solution lengths can be compared with
+the optimal number of moves of a puzzle.
+"""
+
+from .astar import astar, heuristics
+from .bidirectional import bidirectional_search
+from .breadth_search import breadth_search
+from .ida_star import ida_star
+
+SOLVERS = {
+    'breadth_first': lambda board, heuristic, budget: breadth_search(board, budget=budget),
+    'bidirectional': lambda board, heuristic, budget: bidirectional_search(board, budget=budget),
+    'a_star': lambda board, heuristic, budget: astar(board, heuristics[heuristic], budget=budget),
+    'ida_star': lambda board, heuristic, budget: ida_star(board, heuristics[heuristic], budget=budget),
+}
+
+
+def solve(board, algorithm, heuristic='blocking', budget=None):
+    """
+    Runs a search algorithm on a board, the board is left in its starting state.
+
+    Parameters:
+    - board (Board): The board to solve.
+    - algorithm (str): The name of the algorithm, a key of SOLVERS.
+    - heuristic (str): The heuristic of A* and IDA*, 'blocking' or 'exit_distance'.
+    - budget (Budget): Limits of the search, None for no limit.
+
+    Returns:
+    - SolverResult: The solution and the search metrics.
+    """
+    return SOLVERS[algorithm](board, heuristic, budget)
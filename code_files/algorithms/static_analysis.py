@@ -0,0 +1,122 @@
+"""
+Functions that analyse a board without searching its states.
+They find boards that can never be won, so the solvers do not have to run on them.
+"""
+
+def vehicle_line(board, vehicle):
+    """
+    Returns where the row or column of a vehicle is in the grid.
+
+    Parameters:
+    - board (Board): The board the vehicle is on.
+    - vehicle (Vehicle): The vehicle.
+
+    Returns:
+    - tuple: The cell index of offset 0 and the step between offsets, so the
+      cell at an offset is base + offset * stride.
+    """
+    col, row = vehicle.positions[0]
+    if vehicle.orientation == 'H':
+        return row * board.size, 1
+    return col, board.size
+
+def frozen_cells(board, bounds):
+    """
+    Finds the cells that are covered by a vehicle at every offset within its bounds.
+
+    Parameters:
+    - board (Board): The board.
+    - bounds (list): (lowest offset, highest offset) for each vehicle in vehicles_list.
+
+    Returns:
+    - bytearray: One byte per cell, the vehicle index + 1 of the vehicle that always covers it, or 0.
+    """
+    frozen = bytearray(board.size * board.size)
+    for index, (vehicle, (lowest, highest)) in enumerate(zip(board.vehicles_list, bounds)):
+        base, stride = vehicle_line(board, vehicle)
+        for offset in range(highest, lowest + vehicle.length):
+            frozen[base + offset * stride] = index + 1
+    return frozen
+
+def offset_bounds(board):
+    """
+    Finds for every vehicle the lowest and highest offset it could ever reach.
+
+    Every vehicle starts with only its current offset. A vehicle can only grow its
+    bounds into cells that are not frozen by another vehicle, and this is repeated
+    until nothing changes. The bounds are an over-estimate: every reachable state
+    has all its offsets within them.
+
+    Parameters:
+    - board (Board): The board in its current state.
+
+    Returns:
+    - list: (lowest offset, highest offset) for each vehicle in vehicles_list.
+    """
+    lines = [vehicle_line(board, vehicle) + (board.size - vehicle.length,) for vehicle in board.vehicles_list]
+    bounds = [(offset, offset) for offset in board.get_state()]
+
+    changed = True
+    while changed:
+        changed = False
+        frozen = frozen_cells(board, bounds)
+        for index, (vehicle, (base, stride, last)) in enumerate(zip(board.vehicles_list, lines)):
+            lowest, highest = bounds[index]
+            # A vehicle never freezes the cells it grows into, so it can grow as far as they are free
+            while lowest > 0 and not frozen[base + (lowest - 1) * stride]:
+                lowest -= 1
+            while highest < last and not frozen[base + (highest + vehicle.length) * stride]:
+                highest += 1
+            if (lowest, highest) != bounds[index]:
+                bounds[index] = (lowest, highest)
+                changed = True
+
+    return bounds
+
+def exit_blockers(board):
+    """
+    Returns the vehicles on the cells between the red car and the exit.
+
+    Parameters:
+    - board (Board): The board in its current state.
+
+    Returns:
+    - list: The indices in vehicles_list of the blocking vehicles, from the red car to the exit.
+    """
+    last_col, row = board.find_vehicle('X').positions[-1]
+    blockers = []
+    for col in range(last_col + 1, board.size):
+        index = board.occupancy[row * board.size + col] - 1
+        if index >= 0 and index not in blockers:
+            blockers.append(index)
+    return blockers
+
+def unsolvable_reason(board):
+    """
+    Checks whether the board can be proven to be unwinnable without searching.
+
+    Parameters:
+    - board (Board): The board in its current state.
+
+    Returns:
+    - str or None: Why the board cannot be won, 'horizontal blocker' if a horizontal
+      vehicle is between the red car and the exit, 'frozen' if no vehicle can ever
+      move, 'blocked exit' if the red car can never reach the exit, or None if the
+      board might be won.
+    """
+    if board.is_won():
+        return None
+
+    # The red car cannot pass a vehicle that moves along the same row
+    for index in exit_blockers(board):
+        if board.vehicles_list[index].orientation == 'H':
+            return 'horizontal blocker'
+
+    bounds = offset_bounds(board)
+    if all(lowest == highest for lowest, highest in bounds):
+        return 'frozen'
+
+    red_car = board.find_vehicle('X')
+    if bounds[board.vehicle_indices['X']][1] < board.size - red_car.length:
+        return 'blocked exit'
+    return None
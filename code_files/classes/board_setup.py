@@ -1,12 +1,14 @@
-import numpy as np
-import itertools
-import copy
+import hashlib
 from ..algorithms import generator as generator
 from ..classes.stack import Stack as Stack
-from ..visualisation.visualize import plot as visualize
+from ..classes.budget import Budget
+from ..classes.solver_stats import SolverStats
 from ..algorithms.no_reverse import random_without_reverse
 from ..algorithms.depth_search import depth_search
 from ..algorithms.breadth_search import breadth_search
+from ..algorithms.astar import astar, heuristics
+from ..algorithms.bidirectional import bidirectional_search
+from ..algorithms.ida_star import ida_star
 from ..algorithms.randomise import random_step
 
 
@@ -52,6 +54,45 @@ class Vehicle:
         """
 
         self.positions = new_positions
+
+    def moved_positions(self, movement):
+        """
+        Returns the positions of the vehicle after a movement, without moving it.
+
+        Parameters:
+        - movement (int): The number of steps to move the vehicle.
+
+        Returns:
+        - list: The new positions of the vehicle.
+        """
+        if self.orientation == 'H':
+            return [(position[0] + movement, position[1]) for position in self.positions]
+        return [(position[0], position[1] + movement) for position in self.positions]
+
+    def get_offset(self):
+        """
+        Returns the position of the vehicle along its own row or column.
+
+        Returns:
+        - int: The column of the leftmost position for horizontal vehicles,
+          the row of the topmost position for vertical vehicles.
+        """
+        if self.orientation == 'H':
+            return self.positions[0][0]
+        return self.positions[0][1]
+
+    def set_offset(self, offset):
+        """
+        Places the vehicle at the given offset along its own row or column.
+
+        Parameters:
+        - offset (int): The new column (horizontal) or row (vertical) of the first position.
+        """
+        col, row = self.positions[0]
+        if self.orientation == 'H':
+            self.set_positions((offset + 1, row + 1))
+        else:
+            self.set_positions((col + 1, offset + 1))
             
 class Board:
     def __init__(self, size, show_board=False):
@@ -64,10 +105,12 @@ class Board:
         """
 
         self.vehicles_list = []
-        self.nested_vehicle_positions = []
+        self.vehicle_indices = {}
         self.size = size
         self.show_board = show_board
         self.iterations = 0
+        self.stopped = None
+        self.stats = None
 
     def setup_board(self, gameboard):
         """
@@ -76,22 +119,34 @@ class Board:
         Parameters:
         - gameboard (DataFrame): DataFrame containing vehicle information.
         """
+        self.setup_vehicles((name, car['orientation'], car['col'], car['row'], car['length']) for name, car in gameboard.iterrows())
+
+    def setup_vehicles(self, records):
+        """
+        Sets up the board with vehicles and their initial positions, without a DataFrame.
+
+        Parameters:
+        - records (iterable): (name, orientation, col, row, length) of every vehicle, 1-indexed.
+        """
+
+        # Occupancy grid, one cell per square holding the vehicle index + 1, or 0 when empty
+        self.occupancy = bytearray(self.size * self.size)
 
         # Set the grid of the board exit
-        for index, (name, car) in enumerate(gameboard.iterrows()):
+        for index, (name, orientation, col, row, length) in enumerate(records):
             # Set length to be an int instead of string
-            length = int(car['length'])
+            length = int(length)
 
             if name == 'X':
-                colour = np.array([1, 0, 0])
-                self.exit = (car['row'] - 1, self.size - 1)
+                colour = [1, 0, 0]
+                self.exit = (row - 1, self.size - 1)
             else:
                 colour = self.create_colours(index)
 
             # Create vehicle object and add it to the board, n serves as name
-            vehicle = Vehicle(length, car['orientation'], car['col'], car['row'], name, colour)
-            self.vehicles_list.append(vehicle)                  
-            self.nested_vehicle_positions.append(vehicle.positions)
+            vehicle = Vehicle(length, orientation, col, row, name, colour)
+            self.vehicle_indices[name] = len(self.vehicles_list)
+            self.vehicles_list.append(vehicle)
 
         self.update_positions_set()
 
@@ -107,10 +162,10 @@ class Board:
         - Vehicle or None: The found vehicle or None if not found.
         """
 
-        for vehicle in self.vehicles_list:
-            if vehicle.name == name:
-                return vehicle
-        return None
+        index = self.vehicle_indices.get(name)
+        if index is None:
+            return None
+        return self.vehicles_list[index]
     
     def move_piece(self, name, movement, user_input=False):
         """
@@ -132,7 +187,7 @@ class Board:
         route, new_positions = self.make_path(vehicle, movement)
 
         # Check if new position is already occupied
-        if route & self.vehicle_position_set:
+        if self.is_occupied(route):
             raise ValueError("New position already occupied")
 
         if user_input:
@@ -179,115 +234,439 @@ class Board:
                 route = {(vehicle.positions[-1][0] + step, vehicle.positions[-1][1]) for step in range(1, movement + 1)}
             else:
                 route = {(vehicle.positions[0][0] + step, vehicle.positions[0][1]) for step in range(movement, 0)}
-            
-            final_positions = [(position[0] + movement, position[1]) for position in vehicle.positions]
 
         else:
             if movement > 0:
                 route = {(vehicle.positions[-1][0], vehicle.positions[-1][1] + step) for step in range(1,movement+1)}
             else:
                 route = {(vehicle.positions[0][0], vehicle.positions[0][1] + step) for step in range(movement, 0)}
-            
-            final_positions = [(position[0], position[1] + movement) for position in vehicle.positions]
+
+        final_positions = vehicle.moved_positions(movement)
 
         #print(route, final_positions)
         return route, final_positions
 
+    def is_occupied(self, positions):
+        """
+        Checks the occupancy grid for any vehicle on the given positions.
+
+        Parameters:
+        - positions (iterable): The (col, row) positions to check.
+
+        Returns:
+        - bool: True if at least one of the positions is occupied.
+        """
+        for col, row in positions:
+            if self.occupancy[row * self.size + col]:
+                return True
+        return False
+
+    def mark_positions(self, positions, value):
+        """
+        Writes a value into the occupancy grid for the given positions.
+
+        Parameters:
+        - positions (list): The (col, row) positions to mark.
+        - value (int): The vehicle index + 1, or 0 to clear the positions.
+        """
+        for col, row in positions:
+            self.occupancy[row * self.size + col] = value
+
+    def move_range(self, vehicle):
+        """
+        Scans the occupancy grid for how far a vehicle can slide in both directions.
+
+        Parameters:
+        - vehicle (Vehicle): The vehicle to check.
+
+        Returns:
+        - tuple: The lowest (<= 0) and highest (>= 0) legal movement of the vehicle.
+        """
+        occupancy = self.occupancy
+        first_col, first_row = vehicle.positions[0]
+        last_col, last_row = vehicle.positions[-1]
+
+        # Walk along the row or column in steps of one cell
+        if vehicle.orientation == 'H':
+            stride = 1
+            back_limit, forward_limit = first_col, self.size - 1 - last_col
+        else:
+            stride = self.size
+            back_limit, forward_limit = first_row, self.size - 1 - last_row
+
+        first = first_row * self.size + first_col
+        back = 0
+        while back < back_limit and not occupancy[first - (back + 1) * stride]:
+            back += 1
+
+        last = last_row * self.size + last_col
+        forward = 0
+        while forward < forward_limit and not occupancy[last + (forward + 1) * stride]:
+            forward += 1
+
+        return -back, forward
+
+    def move_ranges(self):
+        """
+        Returns the legal slide range of every vehicle on the board.
+        Every movement between the lowest and highest value, except 0, is a legal move.
+
+        Returns:
+        - list: (vehicle, lowest movement, highest movement) for each vehicle in vehicles_list.
+        """
+        return [(vehicle, *self.move_range(vehicle)) for vehicle in self.vehicles_list]
+
+    def legal_moves(self):
+        """Returns the number of legal moves on the board."""
+        return sum(highest - lowest for _, lowest, highest in self.move_ranges())
+
     def update_positions_set(self, vehicle=False, new_positions=False):
         """
-        Updates the set of vehicle positions on the board.
+        Updates the occupancy grid of the board.
+        Moving a single vehicle only touches the cells of that vehicle,
+        without arguments the grid is rebuilt from all vehicles.
 
         Parameters:
         - vehicle (Vehicle): The vehicle to update. Default is False.
         - new_positions (list): The new positions of the vehicle. Default is False.
         """
         if new_positions:
-            self.nested_vehicle_positions.remove(vehicle.positions)
-            self.nested_vehicle_positions.append(new_positions)
+            self.mark_positions(vehicle.positions, 0)
             vehicle.change_position(new_positions)
-        self.vehicle_position_set = set(itertools.chain(*self.nested_vehicle_positions))
+            self.mark_positions(new_positions, self.vehicle_indices[vehicle.name] + 1)
+        else:
+            self.occupancy = bytearray(self.size * self.size)
+            for index, vehicle in enumerate(self.vehicles_list):
+                self.mark_positions(vehicle.positions, index + 1)
+
+    def get_state(self):
+        """
+        Returns a compact, hashable key of the current board state.
+        A vehicle can only move along its own row or column, so the state is
+        fully described by one offset per vehicle, in the order of vehicles_list.
+
+        Returns:
+        - bytes: The state key, one byte per vehicle.
+        """
+        return bytes([vehicle.get_offset() for vehicle in self.vehicles_list])
+
+    def set_state(self, state):
+        """
+        Restores the board to a state key made by get_state.
+
+        Parameters:
+        - state (bytes): The state key, one byte per vehicle.
+        """
+        if len(state) != len(self.vehicles_list):
+            raise ValueError("State does not match the vehicles on the board")
+
+        # Clear all moved vehicles before placing them, so they can swap cells
+        moved = []
+        for index, (vehicle, offset) in enumerate(zip(self.vehicles_list, state)):
+            if vehicle.get_offset() != offset:
+                self.mark_positions(vehicle.positions, 0)
+                vehicle.set_offset(offset)
+                moved.append((index, vehicle))
+
+        for index, vehicle in moved:
+            self.mark_positions(vehicle.positions, index + 1)
+
+    def layout_hash(self):
+        """
+        Returns a hash of everything on the board that does not change with moves:
+        the size and the name, orientation, row or column and length of every vehicle.
+        Boards with the same layout hash can share state keys.
+
+        Returns:
+        - str: The hexadecimal SHA-1 hash of the layout.
+        """
+        layout = [str(self.size)]
+        for vehicle in self.vehicles_list:
+            col, row = vehicle.positions[0]
+            line = row if vehicle.orientation == 'H' else col
+            layout.append(f"{vehicle.name},{vehicle.orientation},{line},{vehicle.length}")
+        return hashlib.sha1(';'.join(layout).encode()).hexdigest()
+
+    def board_hash(self):
+        """
+        Returns a hash of the layout and the current state of the board,
+        equal for boards that are set up the same way.
+
+        Returns:
+        - str: The hexadecimal SHA-1 hash of the board.
+        """
+        return hashlib.sha1(f"{self.layout_hash()}:{self.get_state().hex()}".encode()).hexdigest()
+
+    def canonical_hash(self):
+        """
+        Returns a hash of the current board that ignores the names and the order of the vehicles.
+        Only the red car is told apart from the other vehicles, so boards that are the same
+        up to relabeling the identical pieces get the same hash.
+
+        Returns:
+        - str: The hexadecimal SHA-1 hash of the board.
+        """
+        pieces = sorted((vehicle.name == 'X', vehicle.orientation, vehicle.length, vehicle.positions[0])
+                        for vehicle in self.vehicles_list)
+        return hashlib.sha1(f"{self.size}:{pieces}".encode()).hexdigest()
+
+    def next_states(self, state):
+        """
+        Returns all states that can be reached from a state key in one move.
+        The board is left in the given state.
+
+        Parameters:
+        - state (bytes): The state key to move from.
+
+        Returns:
+        - list: (next state key, vehicle index, movement) for every legal move.
+        """
+        self.set_state(state)
+        next_states = []
+        for index, (vehicle, lowest, highest) in enumerate(self.move_ranges()):
+            head, tail = state[:index], state[index + 1:]
+            offset = state[index]
+            for movement in range(lowest, highest + 1):
+                if movement:
+                    next_states.append((head + bytes((offset + movement,)) + tail, index, movement))
+        return next_states
+
+    def apply_moves(self, moves):
+        """
+        Plays a list of moves on the board.
+
+        Parameters:
+        - moves (list): (vehicle name, movement) tuples.
+        """
+        for name, movement in moves:
+            vehicle = self.find_vehicle(name)
+            self.update_positions_set(vehicle, vehicle.moved_positions(movement))
 
     def print_board(self):
         """Prints the board in a neat format."""
+        # Plotting is only imported when a board is shown, so solving stays headless
+        from ..visualisation.visualize import plot as visualize
         visualize(self.vehicles_list, self.size, self.exit)
 
     def plot_information(self):
         """Returns relevant information of the board"""
         return self.vehicles_list, self.size, self.exit
     
-    def random_solve(self, move_max=10000):
-        """Runs the random algorithm for a set amount of moves or until won"""
+    def random_solve(self, move_max=10000, budget=None):
+        """
+        Runs the random algorithm for a set amount of moves, or until won or the budget is used up.
+
+        Parameters:
+        - move_max (int): Maximum number of moves.
+        - budget (Budget): Limits of the run, replaces move_max when given.
+
+        Returns:
+        - SolverStats: The stats of the run, None if they are not enabled.
+        """
+        budget = budget if budget is not None else Budget(move_max)
+        budget.start()
         self.iterations = 0
-        while not self.is_won() and self.iterations < move_max:
+        self.stopped = None
+        stats = self.stats = SolverStats.start()
+        while not (stats.timed('goal_time', self.is_won) if stats else self.is_won()):
+            self.stopped = budget.exceeded(self.iterations)
+            if self.stopped:
+                break
             self.iterations += 1
-            name, movement, position = random_step(self)
-            vehicle = self.find_vehicle(name)
-            self.update_positions_set(vehicle, position)
+            if stats:
+                stats.states_generated += self.legal_moves()
+                name, movement, position = stats.timed('generate_time', random_step, self)
+                stats.timed('update_time', self.update_positions_set, self.find_vehicle(name), position)
+            else:
+                name, movement, position = random_step(self)
+                vehicle = self.find_vehicle(name)
+                self.update_positions_set(vehicle, position)
+
+        if stats:
+            stats.finish(stats.states_generated, self.iterations, 0, 0, 1)
 
         if self.is_won():
             print(f"Game is won in {self.iterations} moves")
         else:
             print(f"Game not solved after {self.iterations} moves")
+        return stats
 
-    def no_reverse_solve(self, move_max=10000):
-        """Runs the no-reverse algorithm for a set amount of moves or until won"""
+    def no_reverse_solve(self, move_max=10000, budget=None):
+        """
+        Runs the no-reverse algorithm for a set amount of moves, or until won or the budget is used up.
+
+        Parameters:
+        - move_max (int): Maximum number of moves.
+        - budget (Budget): Limits of the run, replaces move_max when given.
+
+        Returns:
+        - SolverStats: The stats of the run, None if they are not enabled.
+        """
+        budget = budget if budget is not None else Budget(move_max)
+        budget.start()
         self.iterations = 0
+        self.stopped = None
+        stats = self.stats = SolverStats.start()
         move = (None, 0, None)
-        while not self.is_won() and self.iterations < move_max:
+        while not (stats.timed('goal_time', self.is_won) if stats else self.is_won()):
+            self.stopped = budget.exceeded(self.iterations)
+            if self.stopped:
+                break
             self.iterations += 1
-            move = random_without_reverse(self, move)
-            vehicle = self.find_vehicle(move[0])
-            self.update_positions_set(vehicle, move[2])
-            
+            if stats:
+                stats.states_generated += self.legal_moves()
+                move = stats.timed('generate_time', random_without_reverse, self, move)
+                stats.timed('update_time', self.update_positions_set, self.find_vehicle(move[0]), move[2])
+            else:
+                move = random_without_reverse(self, move)
+                vehicle = self.find_vehicle(move[0])
+                self.update_positions_set(vehicle, move[2])
+
+        if stats:
+            stats.finish(stats.states_generated, self.iterations, 0, 0, 1)
+
         if self.is_won():
             print(f"Game is won in {self.iterations} moves")
         else:
             print(f"Game not solved after {self.iterations} moves")
+        return stats
+
+    def depth_search(self, move_max=10000, budget=None):
+        """
+        Runs the deep search algorithm for a set amount of moves, or until won or the budget is used up.
 
-    def depth_search(self, move_max=10000):
-        """Runs the deep search algorithm for a set amount of moves or until won"""
+        Parameters:
+        - move_max (int): Maximum number of moves.
+        - budget (Budget): Limits of the run, replaces move_max when given. The
+          states in memory are the states of which the made moves are stored.
+
+        Returns:
+        - SolverStats: The stats of the run, None if they are not enabled. The
+          peak frontier is the deepest path.
+        """
+        budget = budget if budget is not None else Budget(move_max)
+        budget.start()
         self.iterations = 0
+        self.stopped = None
+        stats = self.stats = SolverStats.start()
         bottom = 50
         history = Stack()
         made_moves = {}
-        while not self.is_won() and self.iterations < move_max:
+        peak_depth = 0
+        while not (stats.timed('goal_time', self.is_won) if stats else self.is_won()):
+            self.stopped = budget.exceeded(self.iterations, len(made_moves))
+            if self.stopped:
+                break
             self.iterations += 1
-            name, movement, position, history, made_moves = depth_search(self, history, made_moves, bottom)
-            vehicle = self.find_vehicle(name)
-            self.update_positions_set(vehicle, position)
-            
+            if stats:
+                stats.states_generated += self.legal_moves()
+                name, movement, position, history, made_moves = stats.timed('generate_time', depth_search, self, history, made_moves, bottom)
+                stats.timed('update_time', self.update_positions_set, self.find_vehicle(name), position)
+                peak_depth = max(peak_depth, history.size())
+            else:
+                name, movement, position, history, made_moves = depth_search(self, history, made_moves, bottom)
+                vehicle = self.find_vehicle(name)
+                self.update_positions_set(vehicle, position)
+
+        if stats:
+            stats.finish(stats.states_generated, self.iterations, 0, peak_depth, len(made_moves))
+
         if self.is_won():
             print(f"Game is won in {self.iterations} moves")
         else:
             print(f"Game not solved after {self.iterations} moves")
+        return stats
 
-    def breadth_search(self, move_max=10000):
-        """Runs the broad search algorithm for a set amount of moves or until won"""
-        self.iterations = 0
-        current_layer_boards = []
-        current_layer_index = None
-        former_layer_boards = [(self, (None, None, None))]
-        former_layer_index = 0
-        moves_made = 0
-        board: Board = copy.deepcopy(former_layer_boards[former_layer_index][0])
-        while not board.is_won() and self.iterations < move_max:
-            self.iterations += 1
-            name, movement, position, current_layer_boards, current_layer_index, former_layer_boards, former_layer_index = breadth_search(current_layer_boards, current_layer_index, former_layer_boards, former_layer_index)
-            if former_layer_index == 0:
-                moves_made += 1
-            board: Board = copy.deepcopy(former_layer_boards[former_layer_index][0])
-            vehicle = board.find_vehicle(name)
-            board.update_positions_set(vehicle, position)
-            current_layer_boards.append((board, (name, movement, position)))
-
-        if board.is_won():
-            print(f"Game can be won in {moves_made}, found after {self.iterations} iterations")
-
-            # Heb deze variabel nodig want: while board.is_won() en niet while self.is_won()
-            self.won = True
+    def play_result(self, result):
+        """
+        Stores the metrics of a search, and plays its solution on the board.
+
+        Parameters:
+        - result (SolverResult): The result of the search, from the current state of the board.
+
+        Returns:
+        - SolverResult: The same result.
+        """
+        self.iterations = result.nodes_expanded
+        self.won = result.solved
+        self.stopped = result.stopped
+        self.stats = result.stats
+
+        if result.solved:
+            self.apply_moves(result.moves)
+            print(f"Game can be won in {len(result.moves)}, found after {self.iterations} iterations")
+        elif result.stopped is not None and result.stopped != 'nodes':
+            print(f"Game not solved after {self.iterations} iterations, stopped by the {result.stopped} budget")
         else:
-            print(f"Game not solved after {self.iterations} moves")
-            self.won = False
+            print(f"Game not solved after {self.iterations} iterations")
+        return result
+
+    def breadth_search(self, move_max=10000, budget=None):
+        """
+        Runs the broad search algorithm for a set amount of expanded states, or until won or the budget is used up.
+        The shortest solution is played on the board and returned.
+
+        Parameters:
+        - move_max (int): Maximum number of states to expand.
+        - budget (Budget): Limits of the search, replaces move_max when given.
+        """
+        return self.play_result(breadth_search(self, move_max, budget))
+
+    def bidirectional_search(self, move_max=10000, budget=None):
+        """
+        Runs the bidirectional broad search algorithm for a set amount of expanded states, or until won or the budget is used up.
+        The shortest solution is played on the board and returned.
+
+        Parameters:
+        - move_max (int): Maximum number of states to expand.
+        - budget (Budget): Limits of the search, replaces move_max when given.
+        """
+        return self.play_result(bidirectional_search(self, move_max, budget=budget))
+
+    def astar_solve(self, move_max=10000, heuristic='blocking', budget=None):
+        """
+        Runs the A* algorithm for a set amount of expanded states, or until won or the budget is used up.
+        The shortest solution is played on the board and returned.
+
+        Parameters:
+        - move_max (int): Maximum number of states to expand.
+        - heuristic (str): Name of the heuristic, 'blocking' or 'exit_distance'.
+        - budget (Budget): Limits of the search, replaces move_max when given.
+        """
+        return self.play_result(astar(self, heuristics[heuristic], move_max, budget))
+
+    def ida_star_solve(self, move_max=10000, heuristic='blocking', table_size=1 << 18, budget=None):
+        """
+        Runs the IDA* algorithm for a set amount of expanded states, or until won or the budget is used up.
+        The shortest solution is played on the board and returned.
+
+        Parameters:
+        - move_max (int): Maximum number of states to expand.
+        - heuristic (str): Name of the heuristic, 'blocking' or 'exit_distance'.
+        - table_size (int): Number of slots in the transposition table.
+        - budget (Budget): Limits of the search, replaces move_max when given.
+        """
+        return self.play_result(ida_star(self, heuristics[heuristic], move_max, table_size, budget))
+
+    def solvable_board_df(size, num_cars, car_truck_ratio, lock_limit, exit_distance, HV_ratio, min_optimal=1, max_optimal=None, state_max=20000, attempts=100):
+        """
+        Returns a random board that can be won as a DataFrame, with a shortest
+        solution between min_optimal and max_optimal moves.
+
+        Parameters
+        ----------
+            The same as random_board_df.
+            min_optimal int : Minimum number of moves of the shortest solution.
+            max_optimal int : Maximum number of moves of the shortest solution, None for no limit.
+            state_max int : Maximum number of states of a generated layout, larger layouts are skipped.
+            attempts int : Maximum number of layouts to generate.
+
+        Returns
+        -------
+            initial_state pd.DataFrame : Initial state of the board.
+            optimal_moves int : Number of moves of the shortest solution.
+        """
+        return generator.solvable_board(size, num_cars, car_truck_ratio, lock_limit, exit_distance, HV_ratio, min_optimal, max_optimal, state_max, attempts)
 
     def random_board_df(size, num_cars, car_truck_ratio, lock_limit, exit_distance, HV_ratio):
         """
@@ -343,6 +722,19 @@ class Board:
         else:
             return False
 
+    def is_won_state(self, state):
+        """
+        Checks if a state key is a winning state, without changing the board.
+
+        Parameters:
+        - state (bytes): The state key to check.
+
+        Returns:
+        - bool: True if the red car is at the exit in the given state.
+        """
+        red_car = self.find_vehicle('X')
+        return state[self.vehicle_indices['X']] + red_car.length - 1 == self.exit[1]
+
     def create_colours(self, index):
         """
         Get a unique color to distinguish a care, based on index.
@@ -0,0 +1,74 @@
+import time
+import tracemalloc
+
+
+class Budget:
+    """
+    Limits on the work of a solver. Solvers check their budget while searching and
+    stop cleanly when it is used up, returning what they found as a partial result.
+    A running solver can also be stopped by cancelling its budget from another thread.
+    The clock starts with the first solver that uses the budget, so a solver that hands
+    its budget on to another one cannot reset the time that is left.
+    """
+
+    def __init__(self, node_max=None, time_max=None, state_max=None, memory_max=None):
+        """
+        Initializes the budget, None means no limit.
+
+        Parameters:
+        - node_max (int): Maximum number of states to expand, or moves to make for the random solvers.
+        - time_max (float): Maximum number of seconds to search.
+        - state_max (int): Maximum number of states to keep in memory.
+        - memory_max (int): Maximum number of bytes the solver allocates, measured with tracemalloc.
+          Tracing is started with the solver if it is not running yet, and left running.
+        """
+        self.node_max = node_max
+        self.time_max = time_max
+        self.state_max = state_max
+        self.memory_max = memory_max
+        self.cancelled = False
+        self.start_time = None
+        self.start_memory = None
+
+    def start(self):
+        """Starts the clock of the time budget, called by the solver when it starts searching. A running clock is kept."""
+        if self.start_time is None:
+            self.start_time = time.perf_counter()
+            if self.memory_max is not None:
+                if not tracemalloc.is_tracing():
+                    tracemalloc.start()
+                self.start_memory = tracemalloc.get_traced_memory()[0]
+
+    def elapsed(self):
+        """Returns the seconds since the clock started, 0 if it has not started."""
+        if self.start_time is None:
+            return 0.0
+        return time.perf_counter() - self.start_time
+
+    def cancel(self):
+        """Asks the solver to stop at its next check."""
+        self.cancelled = True
+
+    def exceeded(self, nodes_expanded, states=0):
+        """
+        Checks whether the solver has to stop.
+
+        Parameters:
+        - nodes_expanded (int): The number of states expanded so far.
+        - states (int): The number of states the solver keeps in memory.
+
+        Returns:
+        - str or None: Why the solver has to stop, 'cancelled', 'nodes', 'memory',
+          'memory_ceiling' or 'time', or None if it can continue.
+        """
+        if self.cancelled:
+            return 'cancelled'
+        if self.node_max is not None and nodes_expanded >= self.node_max:
+            return 'nodes'
+        if self.state_max is not None and states >= self.state_max:
+            return 'memory'
+        if self.start_memory is not None and tracemalloc.get_traced_memory()[0] - self.start_memory >= self.memory_max:
+            return 'memory_ceiling'
+        if self.time_max is not None and self.elapsed() >= self.time_max:
+            return 'time'
+        return None
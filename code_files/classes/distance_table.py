@@ -0,0 +1,166 @@
+import mmap
+import os
+import struct
+import zlib
+
+from ..algorithms.retrograde import retrograde_distances
+
+
+class DistanceTable:
+    """
+    Table of the number of moves to win from every state a board can reach,
+    stored in a memory-mapped file.
+
+    The file has a header followed by a hash table of fixed-width records.
+    Each record holds a state key and its distance as an unsigned 16-bit int.
+    Empty records have a key of 0xFF bytes, which no real offset can have.
+    Looking up a state reads only the records it probes.
+    """
+    MAGIC = b'RHDT'
+    VERSION = 1
+    HEADER = struct.Struct('<4sHHHII40s')
+    UNSOLVABLE = 0xFFFF
+
+    def __init__(self, path):
+        """
+        Opens a distance table file.
+
+        Parameters:
+        - path (str): Path to the table file.
+        """
+        self.path = path
+        with open(path, 'rb') as file:
+            self.data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, self.size, self.key_width, self.slots, self.num_states, layout = self.HEADER.unpack_from(self.data)
+        if magic != self.MAGIC or version != self.VERSION:
+            raise ValueError(f"{path} is not a distance table")
+        self.layout_hash = layout.decode()
+        self.record_width = self.key_width + 2
+        self.empty = b'\xff' * self.key_width
+
+    @staticmethod
+    def path_for(board, directory=os.path.join('data', 'tables')):
+        """Returns the path of the table file for the layout of a board."""
+        return os.path.join(directory, f"{board.layout_hash()}.table")
+
+    @classmethod
+    def open_for(cls, board, directory=os.path.join('data', 'tables')):
+        """
+        Opens the table for the layout of a board.
+
+        Returns:
+        - DistanceTable or None: The table, or None if it has not been built.
+        """
+        path = cls.path_for(board, directory)
+        if not os.path.exists(path):
+            return None
+        return cls(path)
+
+    @classmethod
+    def build(cls, board, path=None, node_max=None):
+        """
+        Enumerates all states the board can reach from its current state,
+        finds their distance to a winning state and writes the table.
+
+        Parameters:
+        - board (Board): The board in its starting state.
+        - path (str): Where to write the table, by default in data/tables named after the layout.
+        - node_max (int): Raise a ValueError when there are more states than this, None for no limit.
+
+        Returns:
+        - DistanceTable: The opened table.
+        """
+        if path is None:
+            path = cls.path_for(board)
+        distances, states = retrograde_distances(board, node_max)
+
+        key_width = len(board.vehicles_list)
+        record_width = key_width + 2
+        slots = 1
+        while slots < 2 * len(states):
+            slots *= 2
+
+        records = bytearray(b'\xff' * (slots * record_width))
+        for state in states:
+            slot = zlib.crc32(state) & (slots - 1)
+            while records[slot * record_width:slot * record_width + key_width] != b'\xff' * key_width:
+                slot = (slot + 1) & (slots - 1)
+            offset = slot * record_width
+            records[offset:offset + key_width] = state
+            records[offset + key_width:offset + record_width] = distances.get(state, cls.UNSOLVABLE).to_bytes(2, 'little')
+
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'wb') as file:
+            file.write(cls.HEADER.pack(cls.MAGIC, cls.VERSION, board.size, key_width, slots, len(states), board.layout_hash().encode()))
+            file.write(records)
+        return cls(path)
+
+    def distance(self, state):
+        """
+        Looks up the number of moves to win from a state.
+
+        Parameters:
+        - state (bytes): The state key.
+
+        Returns:
+        - int or None: The distance, UNSOLVABLE if the game cannot be won
+          from the state, or None if the state is not in the table.
+        """
+        state = bytes(state)
+        slot = zlib.crc32(state) & (self.slots - 1)
+        while True:
+            offset = self.HEADER.size + slot * self.record_width
+            key = self.data[offset:offset + self.key_width]
+            if key == state:
+                return int.from_bytes(self.data[offset + self.key_width:offset + self.record_width], 'little')
+            if key == self.empty:
+                return None
+            slot = (slot + 1) & (self.slots - 1)
+
+    def hint(self, board):
+        """
+        Finds a move that brings the board one move closer to winning.
+
+        Parameters:
+        - board (Board): A board with the layout of the table.
+
+        Returns:
+        - tuple or None: (vehicle name, movement, moves left after it), or None
+          if the board is won, unsolvable or not in the table.
+        """
+        state = board.get_state()
+        distance = self.distance(state)
+        if distance is None or distance == 0 or distance == self.UNSOLVABLE:
+            return None
+
+        for next_state, index, movement in board.next_states(state):
+            if self.distance(next_state) == distance - 1:
+                board.set_state(state)
+                return board.vehicles_list[index].name, movement, distance - 1
+
+        board.set_state(state)
+        return None
+
+    def solve(self, board):
+        """
+        Follows the hints from the current state of the board to a winning state.
+        The board is left in its current state.
+
+        Returns:
+        - list or None: The shortest solution as (vehicle name, movement) tuples,
+          or None if the board is unsolvable or not in the table.
+        """
+        state = board.get_state()
+        distance = self.distance(state)
+        if distance is None or distance == self.UNSOLVABLE:
+            return None
+
+        moves = []
+        while len(moves) < distance:
+            name, movement, _ = self.hint(board)
+            board.apply_moves([(name, movement)])
+            moves.append((name, movement))
+
+        board.set_state(state)
+        return moves
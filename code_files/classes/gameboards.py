@@ -0,0 +1,62 @@
+"""
+Functions to load the gameboards in `data/gameboards`.
+"""
+
+import csv
+import os
+import re
+
+from .board_setup import Board
+
+
+def board_size(filename):
+    """
+    Reads the size of a board from its filename, e.g. 12 from Rushhour12x12_7.csv.
+
+    Parameters
+    ----------
+        filename str : Name of the gameboard file.
+
+    Returns
+    -------
+        size int : Size of the board.
+    """
+    return int(re.search(r'(\d+)x\d+', os.path.basename(filename)).group(1))
+
+
+def gameboard_paths(directory=os.path.join('data', 'gameboards')):
+    """Returns the paths of all gameboard csv files in a directory, sorted by name."""
+    return [os.path.join(directory, filename) for filename in sorted(os.listdir(directory)) if filename.endswith('.csv')]
+
+
+def read_records(path):
+    """
+    Reads the vehicles of a gameboard csv file, without pandas.
+
+    Parameters
+    ----------
+        path str : Path to the csv file.
+
+    Returns
+    -------
+        records list : (name, orientation, col, row, length) of every vehicle, 1-indexed.
+    """
+    with open(path, newline='') as file:
+        return [(car['car'], car['orientation'], int(car['col']), int(car['row']), int(car['length'])) for car in csv.DictReader(file)]
+
+
+def load_board(path):
+    """
+    Sets up a board from one of the gameboard csv files.
+
+    Parameters
+    ----------
+        path str : Path to the csv file, the size is read from the filename.
+
+    Returns
+    -------
+        board Board : The board in its starting state.
+    """
+    board = Board(board_size(path))
+    board.setup_vehicles(read_records(path))
+    return board
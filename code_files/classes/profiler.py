@@ -0,0 +1,147 @@
+import cProfile
+import os
+import pstats
+import re
+
+
+class RunProfiler:
+    """
+    Profiles a sample of the algorithm runs with cProfile.
+
+    One in every `every` runs is profiled, the others run without the profiler, so long
+    experiments stay fast. Every profiled run writes two files to <directory>/<algorithm>/:
+    <board id>.prof, the cProfile dump that `python -m pstats` or snakeviz read, and
+    <board id>.collapsed, the time per call stack in microseconds in the collapsed format
+    of flamegraph.pl and speedscope. cProfile only records callers and callees, not whole
+    stacks, so the time of a function called from several places is divided over the
+    stacks in proportion to the time it took from each caller.
+    """
+
+    def __init__(self, every=1, directory=os.path.join('data', 'profiles')):
+        """
+        Initializes the profiler.
+
+        Parameters:
+        - every (int): Profile one in every this many runs.
+        - directory (str): Directory the profiles are written to.
+        """
+        self.every = every
+        self.directory = directory
+        self.runs = 0
+        self.saved = []
+
+    def sampled(self, key=None):
+        """
+        Decides whether a run is profiled.
+
+        Parameters:
+        - key (int): A number that identifies the run, like its seed, so the same runs are
+          profiled in every process. None to profile every `every`-th call.
+
+        Returns:
+        - bool: Whether the run is profiled.
+        """
+        if key is None:
+            key = self.runs
+            self.runs += 1
+        return key % self.every == 0
+
+    def run(self, key, board_id, algorithm, function, *args):
+        """
+        Runs a function, with the profiler if the run is sampled.
+
+        Parameters:
+        - key (int): Decides whether the run is profiled, see sampled.
+        - board_id (str): Name of the board in the filenames.
+        - algorithm (str): Name of the algorithm, the profiles of an algorithm are in one directory.
+        - function (function): The run, called with args.
+
+        Returns:
+        - The return value of the function.
+        """
+        if not self.sampled(key):
+            return function(*args)
+        return self.profile(board_id, algorithm, function, *args)
+
+    def profile(self, board_id, algorithm, function, *args):
+        """Runs a function with the profiler and saves the profile, see run. Returns the return value of the function."""
+        profile = cProfile.Profile()
+        try:
+            return profile.runcall(function, *args)
+        finally:
+            self.save(profile, board_id, algorithm)
+
+    def save(self, profile, board_id, algorithm):
+        """Writes the dump and collapsed stacks of a profiled run, and returns their path without extension."""
+        directory = os.path.join(self.directory, file_name(algorithm))
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, file_name(board_id))
+
+        profile.dump_stats(path + '.prof')
+        with open(path + '.collapsed', 'w') as file:
+            for stack, microseconds in collapsed_stacks(pstats.Stats(profile)):
+                file.write(f"{stack} {microseconds}\n")
+        self.saved.append(path)
+        return path
+
+
+def file_name(name):
+    """Returns a name that is safe in a path, e.g. A_star for A*."""
+    return re.sub(r'[^\w.-]+', '_', str(name).replace('*', '_star'))
+
+
+def function_label(function):
+    """Returns the label of a cProfile function key (filename, line, name) in a stack."""
+    filename, line, name = function
+    if filename == '~':
+        # Built-in functions have no file
+        return name.strip('<>')
+    return f"{name} ({os.path.basename(filename)}:{line})"
+
+
+def collapsed_stacks(stats, depth_max=64, share_min=1e-6):
+    """
+    Rebuilds the call stacks of a cProfile run from its callers and callees.
+
+    Parameters:
+    - stats (pstats.Stats): The stats of the run.
+    - depth_max (int): Deepest stack that is followed.
+    - share_min (float): Stacks with a smaller share of the time of their function are left out.
+
+    Returns:
+    - list: (stack, microseconds) of the time spent in the last function of every stack,
+      the stack as function labels joined by ';'.
+    """
+    callees = {}
+    roots = []
+    for function, (_, _, _, _, callers) in stats.stats.items():
+        known = [caller for caller in callers if caller in stats.stats]
+        if not known:
+            roots.append(function)
+        for caller in known:
+            callees.setdefault(caller, []).append((function, callers[caller][3]))
+
+    times = {}
+
+    def visit(function, stack, path, share):
+        own_time = stats.stats[function][2]
+        stack = stack + (function_label(function),)
+        microseconds = round(own_time * share * 1e6)
+        if microseconds:
+            key = ';'.join(stack)
+            times[key] = times.get(key, 0) + microseconds
+        if len(stack) >= depth_max:
+            return
+
+        for callee, edge_time in callees.get(function, []):
+            callee_total = stats.stats[callee][3]
+            # Recursive calls are part of the time of the outer call
+            if callee in path or not callee_total:
+                continue
+            callee_share = share * min(edge_time / callee_total, 1.0)
+            if callee_share >= share_min:
+                visit(callee, stack, path | {callee}, callee_share)
+
+    for root in roots:
+        visit(root, (), {root}, 1.0)
+    return sorted(times.items())
@@ -0,0 +1,201 @@
+"""
+Functions to read and write puzzle databases in the one-line format.
+
+Every line holds one puzzle as a string of size * size characters, row by row:
+'o' or '.' for an empty cell, 'x' for a wall and a letter per vehicle, where 'A'
+is the red car. Like in the public Rush Hour databases, the line may start with
+the optimal number of moves and have more fields after the board, e.g.
+
+    51 GBBoLoGHIoLMGHIAAMCCCKoMooJKDDEEJFFo 4780
+
+The files are read and written one line at a time, so databases with millions
+of puzzles never have to fit in memory. The puzzles are (size, records, optimal)
+tuples, with records the (name, orientation, col, row, length) of every vehicle,
+1-indexed, as used by Board.setup_vehicles and PuzzlePack.write.
+"""
+
+import math
+import string
+from itertools import islice
+
+EMPTY = 'o.'
+WALL = 'x'
+RED_CAR = 'A'
+
+
+class WallError(ValueError):
+    """Raised for a board with walls, which the Board class cannot hold."""
+
+
+def parse_board(board_string):
+    """
+    Reads the vehicles of a board from its one-line string.
+
+    Parameters
+    ----------
+        board_string str : The cells of the board, row by row.
+
+    Returns
+    -------
+        size int : Size of the board.
+        records list : (name, orientation, col, row, length) of every vehicle, 1-indexed.
+        The red car 'A' is named X, and a vehicle named X is named A.
+    """
+    size = math.isqrt(len(board_string))
+    if size * size != len(board_string):
+        raise ValueError(f"A board of {len(board_string)} cells is not square")
+
+    cells = {}
+    for index, char in enumerate(board_string):
+        if char in EMPTY:
+            continue
+        if char == WALL:
+            raise WallError("Boards with walls are not supported")
+        cells.setdefault(char, []).append(index)
+    if RED_CAR not in cells:
+        raise ValueError("The board has no red car")
+
+    records = []
+    for char, indices in cells.items():
+        row, col = divmod(indices[0], size)
+        orientation = 'H' if len(indices) > 1 and indices[1] == indices[0] + 1 else 'V'
+        stride = 1 if orientation == 'H' else size
+        if indices != list(range(indices[0], indices[0] + len(indices) * stride, stride)) or len(indices) < 2 or \
+                (orientation == 'H' and col + len(indices) > size):
+            raise ValueError(f"Vehicle {char} is not a straight line of cells")
+        name = 'X' if char == RED_CAR else RED_CAR if char == 'X' else char
+        records.append((name, orientation, col + 1, row + 1, len(indices)))
+    return size, records
+
+
+def parse_line(line):
+    """
+    Reads a puzzle from a line of a database.
+
+    Parameters
+    ----------
+        line str : The line, the optimal number of moves before the board is optional.
+
+    Returns
+    -------
+        puzzle tuple : (size, records, optimal), optimal is None if the line has none.
+        None for empty lines and comments starting with '#'.
+    """
+    fields = line.split()
+    if not fields or fields[0].startswith('#'):
+        return None
+
+    optimal = None
+    for field in fields:
+        if field.lstrip('-').isdigit():
+            optimal = int(field)
+            continue
+        size, records = parse_board(field)
+        return size, records, optimal
+    raise ValueError(f"No board in line: {line.strip()}")
+
+
+def board_string(size, records):
+    """
+    Writes the one-line string of a board.
+    The red car becomes 'A', and the other vehicles get the letters B to Z in the order of their first cell.
+
+    Parameters
+    ----------
+        size int : Size of the board.
+        records list : (name, orientation, col, row, length) of every vehicle, 1-indexed.
+
+    Returns
+    -------
+        board_string str : The cells of the board, row by row.
+    """
+    letters = iter(string.ascii_uppercase[1:])
+    cells = ['o'] * (size * size)
+    for name, orientation, col, row, length in sorted(records, key=lambda record: (record[3], record[2])):
+        if name == 'X':
+            letter = RED_CAR
+        else:
+            letter = next(letters, None)
+            if letter is None:
+                raise ValueError("Boards with more than 26 vehicles do not fit in the one-line format")
+        stride = 1 if orientation == 'H' else size
+        first = (row - 1) * size + col - 1
+        for index in range(length):
+            cells[first + index * stride] = letter
+    return ''.join(cells)
+
+
+def format_line(size, records, optimal=None):
+    """Returns the line of a puzzle, with the optimal number of moves first if it is known."""
+    board = board_string(size, records)
+    return board if optimal is None else f"{optimal} {board}"
+
+
+def read_puzzles(path, skipped=None):
+    """
+    Reads the puzzles of a database one line at a time.
+
+    Parameters
+    ----------
+        path str : Path to the database.
+        skipped list : If given, the line numbers of boards with walls are added to it, otherwise they raise a WallError.
+
+    Yields
+    ------
+        puzzle tuple : (size, records, optimal) of every puzzle.
+    """
+    with open(path) as file:
+        for number, line in enumerate(file, 1):
+            try:
+                puzzle = parse_line(line)
+            except WallError:
+                if skipped is None:
+                    raise
+                skipped.append(number)
+                continue
+            except ValueError as e:
+                raise ValueError(f"{path}, line {number}: {e}") from None
+            if puzzle is not None:
+                yield puzzle
+
+
+def write_puzzles(path, puzzles):
+    """
+    Writes puzzles to a database one line at a time.
+
+    Parameters
+    ----------
+        path str : Path to the database.
+        puzzles iterable : (size, records, optimal) of every puzzle.
+
+    Returns
+    -------
+        count int : Number of puzzles written.
+    """
+    count = 0
+    with open(path, 'w') as file:
+        for size, records, optimal in puzzles:
+            file.write(format_line(size, records, optimal) + '\n')
+            count += 1
+    return count
+
+
+def chunks(puzzles, chunk_size):
+    """
+    Splits puzzles into lists of at most chunk_size puzzles, without reading ahead.
+
+    Parameters
+    ----------
+        puzzles iterable : The puzzles.
+        chunk_size int : Maximum number of puzzles per chunk.
+
+    Yields
+    ------
+        chunk list : The next puzzles.
+    """
+    puzzles = iter(puzzles)
+    while True:
+        chunk = list(islice(puzzles, chunk_size))
+        if not chunk:
+            return
+        yield chunk
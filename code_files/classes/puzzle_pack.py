@@ -0,0 +1,188 @@
+import mmap
+import os
+import shutil
+import struct
+import sys
+import tempfile
+from array import array
+
+from .board_setup import Board
+from .gameboards import board_size, read_records
+
+
+class PuzzlePack:
+    """
+    Collection of puzzles in one binary file, read by puzzle id without loading the others.
+
+    The file has a header, an index with the file offset of every puzzle and then the
+    puzzles. A puzzle is the size of the board, its number of vehicles and its optimal
+    number of moves, followed by one fixed-width record per vehicle with its name,
+    orientation, column, row and length. The file is memory-mapped, so opening a pack
+    reads nothing but the header, and loading a puzzle only reads its own records.
+
+    A pack can be used like the list of gameboards of main.py: pack[id] is (DataFrame, size).
+    """
+    MAGIC = b'RHPK'
+    VERSION = 1
+    HEADER = struct.Struct('<4sHI')
+    OFFSET = struct.Struct('<Q')
+    PUZZLE = struct.Struct('<BBH')
+    VEHICLE = struct.Struct('<2scBBB')
+    UNKNOWN = 0xFFFF
+    UNSOLVABLE = 0xFFFE
+
+    def __init__(self, path):
+        """
+        Opens a puzzle pack file.
+
+        Parameters:
+        - path (str): Path to the pack file.
+        """
+        self.path = path
+        with open(path, 'rb') as file:
+            self.data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, self.count = self.HEADER.unpack_from(self.data)
+        if magic != self.MAGIC or version != self.VERSION:
+            raise ValueError(f"{path} is not a puzzle pack")
+
+    @classmethod
+    def write(cls, path, puzzles):
+        """
+        Writes a pack file. A puzzle that does not fit in the fixed-width fields, like a vehicle
+        name of more than 2 ASCII characters or an optimal number of moves of 65534 or more,
+        raises a ValueError with the index of the puzzle, before the pack file is created.
+
+        Parameters:
+        - path (str): Where to write the pack.
+        - puzzles (iterable): (size, records, optimal) of every puzzle, read one at a time, with records the
+          (name, orientation, col, row, length) of every vehicle, 1-indexed, and optimal
+          the optimal number of moves, -1 if the board cannot be won or None if it is unknown.
+
+        Returns:
+        - PuzzlePack: The opened pack.
+
+        """
+        # The records are written to a temporary file first, as the index before them needs the number of puzzles
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        offsets = array('Q')
+        with tempfile.TemporaryFile(dir=os.path.dirname(path) or '.') as records:
+            position = 0
+            for index, (size, vehicles, optimal) in enumerate(puzzles):
+                offsets.append(position)
+                if optimal is None:
+                    optimal = cls.UNKNOWN
+                elif optimal < 0:
+                    optimal = cls.UNSOLVABLE
+                elif optimal >= cls.UNSOLVABLE:
+                    raise ValueError(f"Puzzle {index}: optimal number of moves {optimal} does not fit in a pack, "
+                                     f"the largest is {cls.UNSOLVABLE - 1}")
+                # struct cuts longer names off without an error
+                for name, *_ in vehicles:
+                    if not name.isascii() or not 0 < len(name) <= 2:
+                        raise ValueError(f"Puzzle {index}: vehicle name {name!r} is not 1 or 2 ASCII characters")
+                try:
+                    record = cls.PUZZLE.pack(size, len(vehicles), optimal) + b''.join(
+                        cls.VEHICLE.pack(name.encode('ascii'), orientation.encode('ascii'), col, row, length)
+                        for name, orientation, col, row, length in vehicles)
+                except (struct.error, UnicodeEncodeError) as error:
+                    raise ValueError(f"Puzzle {index} does not fit in a pack: {error}") from error
+                records.write(record)
+                position += len(record)
+
+            start = cls.HEADER.size + len(offsets) * cls.OFFSET.size
+            for index in range(len(offsets)):
+                offsets[index] += start
+            if sys.byteorder != 'little':
+                offsets.byteswap()
+
+            records.seek(0)
+            with open(path, 'wb') as file:
+                file.write(cls.HEADER.pack(cls.MAGIC, cls.VERSION, len(offsets)))
+                offsets.tofile(file)
+                shutil.copyfileobj(records, file)
+        return cls(path)
+
+    @classmethod
+    def from_csvs(cls, path, csv_paths):
+        """
+        Converts gameboard csv files to a pack, in the order of the paths.
+
+        Parameters:
+        - path (str): Where to write the pack.
+        - csv_paths (list): Paths of the csv files, the size is read from the filenames.
+
+        Returns:
+        - PuzzlePack: The opened pack.
+        """
+        return cls.write(path, ((board_size(csv_path), read_records(csv_path), None) for csv_path in csv_paths))
+
+    def __len__(self):
+        return self.count
+
+    def offset(self, puzzle_id):
+        """Returns the file offset of a puzzle."""
+        if not 0 <= puzzle_id < self.count:
+            raise IndexError(f"{self.path} has no puzzle {puzzle_id}")
+        return self.OFFSET.unpack_from(self.data, self.HEADER.size + puzzle_id * self.OFFSET.size)[0]
+
+    def info(self, puzzle_id):
+        """
+        Reads the header of a puzzle, without its vehicles.
+
+        Returns:
+        - tuple: The size of the board, its number of vehicles and its optimal number of
+          moves, -1 if the board cannot be won or None if it is unknown.
+        """
+        size, num_vehicles, optimal = self.PUZZLE.unpack_from(self.data, self.offset(puzzle_id))
+        if optimal == self.UNKNOWN:
+            optimal = None
+        elif optimal == self.UNSOLVABLE:
+            optimal = -1
+        return size, num_vehicles, optimal
+
+    def records(self, puzzle_id):
+        """
+        Reads the vehicles of a puzzle.
+
+        Returns:
+        - list: (name, orientation, col, row, length) of every vehicle, 1-indexed.
+        """
+        offset = self.offset(puzzle_id)
+        _, num_vehicles, _ = self.PUZZLE.unpack_from(self.data, offset)
+        offset += self.PUZZLE.size
+        return [(name.rstrip(b'\x00').decode('ascii'), orientation.decode('ascii'), col, row, length)
+                for name, orientation, col, row, length in self.VEHICLE.iter_unpack(self.data[offset:offset + num_vehicles * self.VEHICLE.size])]
+
+    def puzzles(self):
+        """Yields (size, records, optimal) of every puzzle in order, like PuzzlePack.write takes them."""
+        for puzzle_id in range(self.count):
+            size, _, optimal = self.info(puzzle_id)
+            yield size, self.records(puzzle_id), optimal
+
+    def frame(self, puzzle_id):
+        """Returns the DataFrame of a puzzle, as read from a gameboard csv file."""
+        import pandas as pd
+
+        records = self.records(puzzle_id)
+        return pd.DataFrame([record[1:] for record in records], columns=['orientation', 'col', 'row', 'length'],
+                            index=pd.Index([record[0] for record in records], name='car'))
+
+    def __getitem__(self, puzzle_id):
+        """Returns (DataFrame, size) of a puzzle, like the gameboards of main.py."""
+        return self.frame(puzzle_id), self.info(puzzle_id)[0]
+
+    def board(self, puzzle_id):
+        """
+        Sets up the board of a puzzle.
+
+        Returns:
+        - Board: The board in its starting state.
+        """
+        board = Board(self.info(puzzle_id)[0])
+        board.setup_vehicles(self.records(puzzle_id))
+        return board
+
+    def close(self):
+        """Closes the file."""
+        self.data.close()
@@ -0,0 +1,121 @@
+import csv
+import os
+
+
+class ResultWriter:
+    """
+    Append-only CSV file for experiment results, written in chunks while the experiment runs.
+
+    Every chunk is flushed to disk, so a crashed or interrupted experiment keeps the
+    results of all finished chunks. In resume mode the existing file is kept and the
+    (seed, algorithm) pairs it already contains are collected, so they can be skipped.
+    """
+    COLUMNS = ['size', 'num_cars', 'algorithm', 'solved', 'lock_limit', 'moves', 'time', 'move_max',
+               'car_truck_ratio', 'HV_ratio', 'min_exit_distance', 'solution_length', 'peak_frontier',
+               'cached', 'peak_memory', 'optimal_moves', 'optimal', 'duplicate', 'profiled', 'states_generated',
+               'states_expanded', 'duplicate_hits', 'branching_factor', 'visited', 'generate_time', 'update_time',
+               'goal_time', 'seed', 'experiment_seed']
+    DTYPES = {'size': 'int64', 'num_cars': 'int64', 'algorithm': 'string', 'solved': 'string',
+              'lock_limit': 'int64', 'moves': 'int64', 'time': 'float64', 'move_max': 'int64',
+              'car_truck_ratio': 'string', 'HV_ratio': 'string', 'min_exit_distance': 'int64',
+              'solution_length': 'Int64', 'peak_frontier': 'Int64', 'cached': 'boolean', 'peak_memory': 'Int64',
+              'optimal_moves': 'Int64', 'optimal': 'boolean', 'duplicate': 'boolean', 'profiled': 'boolean',
+              'states_generated': 'Int64', 'states_expanded': 'Int64', 'duplicate_hits': 'Int64',
+              'branching_factor': 'float64', 'visited': 'Int64', 'generate_time': 'float64',
+              'update_time': 'float64', 'goal_time': 'float64', 'seed': 'int64', 'experiment_seed': 'int64'}
+
+    def __init__(self, path, chunk_size=100, resume=False):
+        """
+        Opens the results file.
+
+        Parameters:
+        - path (str): Path to the CSV file.
+        - chunk_size (int): Number of rows to collect before they are written.
+        - resume (bool): Keep the rows of an existing file instead of overwriting it.
+        """
+        self.path = path
+        self.chunk_size = chunk_size
+        self.buffer = []
+        self.completed = set()
+        self.experiment_seed = None
+
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        if resume and os.path.exists(path):
+            self.read_completed()
+            self.file = open(path, 'a', newline='')
+        else:
+            self.file = open(path, 'w', newline='')
+            self.file.write(','.join(self.COLUMNS) + '\n')
+        self.writer = csv.DictWriter(self.file, self.COLUMNS, restval='', extrasaction='ignore')
+
+    def read_completed(self):
+        """Collects the (seed, algorithm) pairs in the file, after removing a line that was only partly written."""
+        with open(self.path, 'rb+') as file:
+            data = file.read()
+            file.truncate(data.rfind(b'\n') + 1)
+
+        with open(self.path, newline='') as file:
+            for row in csv.DictReader(file):
+                self.completed.add((int(row['seed']), row['algorithm']))
+                if self.experiment_seed is None:
+                    self.experiment_seed = int(row['experiment_seed'])
+
+    def read_rows(self, seeds):
+        """
+        Reads the rows of some boards from the file, like the rows of an earlier board that is
+        copied to a duplicate in a resumed experiment.
+
+        Parameters:
+        - seeds (set): Seeds of the boards.
+
+        Returns:
+        - dict: The rows of every seed, as dictionaries of strings.
+        """
+        rows = {}
+        with open(self.path, newline='') as file:
+            for row in csv.DictReader(file):
+                seed = int(row['seed'])
+                if seed in seeds:
+                    rows.setdefault(seed, []).append(row)
+        return rows
+
+    def write(self, rows):
+        """
+        Adds rows to the file, they are written once a chunk is full.
+
+        Parameters:
+        - rows (list): Rows as dictionaries with keys from COLUMNS.
+        """
+        self.buffer.extend(rows)
+        if len(self.buffer) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        """Writes the collected rows to disk."""
+        self.writer.writerows(self.buffer)
+        self.buffer = []
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def close(self):
+        """Writes the remaining rows and closes the file."""
+        self.flush()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @classmethod
+    def read(cls, path):
+        """
+        Reads a results file with the types of its columns.
+
+        Returns:
+        - pd.DataFrame: The results.
+        """
+        import pandas as pd
+
+        return pd.read_csv(path, dtype=cls.DTYPES)
@@ -0,0 +1,116 @@
+import json
+import os
+import sqlite3
+import time
+
+from .solver_result import SolverResult
+
+
+class SolutionCache:
+    """
+    Persistent cache of solver results in an SQLite database.
+
+    Results are stored per board state and solver, with the solution moves,
+    whether the solution is optimal, and the metrics of the original run.
+    When the cache holds more than max_entries results, the results that
+    were used least recently are removed.
+    """
+
+    def __init__(self, path=os.path.join('data', 'solution_cache.sqlite'), max_entries=100000):
+        """
+        Opens the cache, creating the database if it does not exist.
+
+        Parameters:
+        - path (str): Path to the database file.
+        - max_entries (int): Maximum number of results to keep.
+        """
+        self.path = path
+        self.max_entries = max_entries
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+
+        self.connection = sqlite3.connect(path, timeout=60)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self.connection.execute('''CREATE TABLE IF NOT EXISTS solutions (
+                                       board TEXT, solver TEXT, moves TEXT, optimal INTEGER,
+                                       nodes_expanded INTEGER, peak_frontier INTEGER, runtime REAL, last_used REAL,
+                                       PRIMARY KEY (board, solver))''')
+        self.connection.execute('CREATE INDEX IF NOT EXISTS solutions_last_used ON solutions (last_used)')
+        self.connection.commit()
+
+    def get(self, key, solver):
+        """
+        Looks up a result and marks it as used.
+
+        Parameters:
+        - key (str): The hash of the board, from Board.board_hash.
+        - solver (str): The name of the solver.
+
+        Returns:
+        - SolverResult or None: The cached result, or None if it is not in the cache.
+        """
+        row = self.connection.execute('SELECT moves, optimal, nodes_expanded, peak_frontier, runtime FROM solutions WHERE board = ? AND solver = ?',
+                                      (key, solver)).fetchone()
+        if row is None:
+            return None
+
+        self.connection.execute('UPDATE solutions SET last_used = ? WHERE board = ? AND solver = ?', (time.time(), key, solver))
+        self.connection.commit()
+
+        moves, optimal, nodes_expanded, peak_frontier, runtime = row
+        result = SolverResult(solver, True, [tuple(move) for move in json.loads(moves)], nodes_expanded, peak_frontier, runtime)
+        result.optimal = bool(optimal)
+        result.cached = True
+        return result
+
+    def put(self, key, solver, result, optimal=True):
+        """
+        Stores a solved result, and removes the least recently used results if the cache is full.
+
+        Parameters:
+        - key (str): The hash of the board, from Board.board_hash.
+        - solver (str): The name of the solver.
+        - result (SolverResult): The solved result.
+        - optimal (bool): Whether the solver guarantees the shortest solution.
+        """
+        self.connection.execute('INSERT OR REPLACE INTO solutions VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                                (key, solver, json.dumps(result.moves), int(optimal), result.nodes_expanded,
+                                 result.peak_frontier, result.runtime, time.time()))
+
+        surplus = self.connection.execute('SELECT COUNT(*) FROM solutions').fetchone()[0] - self.max_entries
+        if surplus > 0:
+            self.connection.execute('DELETE FROM solutions WHERE rowid IN (SELECT rowid FROM solutions ORDER BY last_used LIMIT ?)', (surplus,))
+        self.connection.commit()
+
+    def solve(self, board, solver, solve, optimal=True):
+        """
+        Returns the cached result of a solver for the board, or runs the solver and stores it.
+        Like the solve methods of the board, the solution is played on the board.
+
+        Parameters:
+        - board (Board): The board in its starting state.
+        - solver (str): The name of the solver.
+        - solve (function): solve(board) runs the solver and returns a SolverResult.
+        - optimal (bool): Whether the solver guarantees the shortest solution.
+
+        Returns:
+        - SolverResult: The result, with cached set to True if it came from the cache.
+        """
+        key = board.board_hash()
+        result = self.get(key, solver)
+        if result is not None:
+            board.apply_moves(result.moves)
+            board.iterations = result.nodes_expanded
+            board.won = True
+            board.stopped = None
+            print(f"Game can be won in {len(result.moves)}, found in the cache")
+            return result
+
+        result = solve(board)
+        if result.solved:
+            self.put(key, solver, result, optimal)
+        return result
+
+    def close(self):
+        """Closes the database."""
+        self.connection.close()
@@ -0,0 +1,37 @@
+class SolverResult:
+    def __init__(self, algorithm, solved, moves, nodes_expanded, peak_frontier, runtime, stopped=None, stats=None):
+        """
+        Initializes the result of a solver run.
+
+        Parameters:
+        - algorithm (str): The name of the solver.
+        - solved (bool): Whether a solution was found.
+        - moves (list): The solution as (vehicle name, movement) tuples, empty if not solved.
+        - nodes_expanded (int): The number of states the solver expanded.
+        - peak_frontier (int): The largest number of states waiting to be expanded at once.
+        - runtime (float): The time the solver took in seconds.
+        - stopped (str): The part of the budget that ran out before the search finished,
+          'nodes', 'time', 'memory', 'memory_ceiling' or 'cancelled', None if the search finished.
+        - stats (SolverStats): Counters and phase timings of the run, None if they were not collected.
+        """
+        self.algorithm = algorithm
+        self.solved = solved
+        self.moves = moves
+        self.nodes_expanded = nodes_expanded
+        self.peak_frontier = peak_frontier
+        self.runtime = runtime
+        self.stopped = stopped
+        self.stats = stats
+        self.cached = False
+
+    def solution_length(self):
+        """Returns the number of moves in the solution, or None if not solved."""
+        return len(self.moves) if self.solved else None
+
+    def as_dict(self):
+        """Returns the result as a dictionary, to be used as a row of experiment data."""
+        row = {'solution_length': self.solution_length(), 'nodes_expanded': self.nodes_expanded,
+               'peak_frontier': self.peak_frontier, 'runtime': self.runtime, 'stopped': self.stopped}
+        if self.stats is not None:
+            row.update(self.stats.as_dict())
+        return row
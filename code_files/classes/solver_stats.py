@@ -0,0 +1,85 @@
+import time
+
+
+class SolverStats:
+    """
+    Counters and phase timings of one solver run.
+
+    The solvers only collect them when SolverStats.enabled is set, otherwise the stats
+    of their result are None. Timing the phases takes a clock reading around every move
+    generation, state update and goal test, which slows the search down, so it is off
+    by default and meant for experiments that study the algorithms.
+    """
+    enabled = False
+    COLUMNS = ['states_generated', 'states_expanded', 'duplicate_hits', 'branching_factor', 'peak_frontier',
+               'visited', 'generate_time', 'update_time', 'goal_time']
+
+    def __init__(self):
+        """
+        Initializes empty stats.
+
+        Attributes:
+        - states_generated (int): The number of states reached by a move, including duplicates.
+        - states_expanded (int): The number of states of which the moves were generated.
+        - duplicate_hits (int): The number of generated states that were already seen and not kept.
+        - peak_frontier (int): The largest number of states waiting to be expanded at once,
+          the deepest path for depth-first searches.
+        - visited (int): The number of states stored when the run ended.
+        - generate_time (float): Seconds spent generating the moves of states.
+        - update_time (float): Seconds spent moving vehicles on the board.
+        - goal_time (float): Seconds spent testing whether states are won.
+        """
+        self.states_generated = 0
+        self.states_expanded = 0
+        self.duplicate_hits = 0
+        self.peak_frontier = 0
+        self.visited = 0
+        self.generate_time = 0.0
+        self.update_time = 0.0
+        self.goal_time = 0.0
+
+    @classmethod
+    def start(cls):
+        """Returns new stats for a solver run if they are enabled, otherwise None."""
+        return cls() if cls.enabled else None
+
+    def finish(self, states_generated, states_expanded, duplicate_hits, peak_frontier, visited):
+        """
+        Stores the counters at the end of a run, the solvers count in local variables.
+
+        Returns:
+        - SolverStats: The same stats.
+        """
+        self.states_generated = states_generated
+        self.states_expanded = states_expanded
+        self.duplicate_hits = duplicate_hits
+        self.peak_frontier = peak_frontier
+        self.visited = visited
+        return self
+
+    def timed(self, phase, function, *args):
+        """
+        Calls a function and adds the time it took to a phase.
+
+        Parameters:
+        - phase (str): 'generate_time', 'update_time' or 'goal_time'.
+        - function (function): The function to call with args.
+
+        Returns:
+        - The return value of the function.
+        """
+        tick = time.perf_counter()
+        value = function(*args)
+        setattr(self, phase, getattr(self, phase) + time.perf_counter() - tick)
+        return value
+
+    def branching_factor(self):
+        """Returns the mean number of states generated per expanded state, or None if none was expanded."""
+        return self.states_generated / self.states_expanded if self.states_expanded else None
+
+    def as_dict(self):
+        """Returns the stats as a dictionary with the keys of COLUMNS, to be added to a row of experiment data."""
+        return {'states_generated': self.states_generated, 'states_expanded': self.states_expanded,
+                'duplicate_hits': self.duplicate_hits, 'branching_factor': self.branching_factor(),
+                'peak_frontier': self.peak_frontier, 'visited': self.visited, 'generate_time': self.generate_time,
+                'update_time': self.update_time, 'goal_time': self.goal_time}
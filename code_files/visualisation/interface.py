@@ -9,19 +9,21 @@ from ..classes.stack import Stack
 from code_files.visualisation.int_vis import plot as visualize
 from code_files.visualisation.visualize import plot as figure
 from code_files.classes.board_setup import Board as Board
+from code_files.classes.distance_table import DistanceTable
 from ..algorithms.no_reverse import random_without_reverse
-from ..algorithms.breadth_search import breadth_search
 from ..algorithms.randomise import random_step
 from ..algorithms.depth_search import depth_search
 
+import os
 import time
-import copy
 import pandas as pd
 
 
 class Interface:
-    def __init__(self, master, gameboards):
+    def __init__(self, master, gameboards, cache=None, profiler=None):
         self.gameboards = gameboards
+        self.cache = cache
+        self.profiler = profiler
         self.master = master
         self.input_name = False
         self.output_name = False
@@ -44,7 +46,7 @@ class Interface:
         # Set a default image
         self.image_var.set("game 1")
         # Add options
-        images = ["game 1", "game 2", "game 3", "game 4", "game 5", "game 6", "game 7", "game 8"]
+        images = [f"game {number}" for number in range(1, len(self.gameboards) + 1)]
 
         # Set image menu
         image_menu = ttk.Combobox(master = self.master, textvariable = self.image_var, values = images)
@@ -87,19 +89,19 @@ class Interface:
         self.load_image()  
 
         # Buttons for different functionalities
-        user_button = ttk.Button(master = self.master, text = "depth_search", command = lambda: self.experiment(int(image_menu.get()[-1])-1, alg_type = 'depth', visual = self.visualization_choice.get()))
+        user_button = ttk.Button(master = self.master, text = "depth_search", command = lambda: self.experiment(int(image_menu.get().split()[-1])-1, alg_type = 'depth', visual = self.visualization_choice.get()))
         user_button.pack(side=tk.BOTTOM, fill=tk.X)
 
-        algorithm_button = ttk.Button(master = self.master, text = "breadth_search", command = lambda: self.experiment(int(image_menu.get()[-1])-1, alg_type = 'breadth', visual = self.visualization_choice.get()))
+        algorithm_button = ttk.Button(master = self.master, text = "breadth_search", command = lambda: self.experiment(int(image_menu.get().split()[-1])-1, alg_type = 'breadth', visual = self.visualization_choice.get()))
         algorithm_button.pack(side=tk.BOTTOM, fill=tk.X)
 
-        algorithm_button = ttk.Button(master = self.master, text = "Not reversing random algorithm", command = lambda: self.experiment(int(image_menu.get()[-1])-1, alg_type = 'non-reverse', visual = self.visualization_choice.get()))
+        algorithm_button = ttk.Button(master = self.master, text = "Not reversing random algorithm", command = lambda: self.experiment(int(image_menu.get().split()[-1])-1, alg_type = 'non-reverse', visual = self.visualization_choice.get()))
         algorithm_button.pack(side=tk.BOTTOM, fill=tk.X)
 
-        random_button = ttk.Button(master = self.master, text = "Random", command = lambda: self.experiment(int(image_menu.get()[-1])-1, alg_type = 'random', visual = self.visualization_choice.get()))
+        random_button = ttk.Button(master = self.master, text = "Random", command = lambda: self.experiment(int(image_menu.get().split()[-1])-1, alg_type = 'random', visual = self.visualization_choice.get()))
         random_button.pack(side=tk.BOTTOM, fill=tk.X)
 
-        user_button = ttk.Button(master = self.master, text = "User", command = lambda: self.create_user(int(image_menu.get()[-1])-1))
+        user_button = ttk.Button(master = self.master, text = "User", command = lambda: self.create_user(int(image_menu.get().split()[-1])-1))
         user_button.pack(side=tk.BOTTOM, fill=tk.X)
 
     def create_user(self, board_number):
@@ -129,9 +131,13 @@ class Interface:
         move_button = ttk.Button(master=self.master, text="Move", command=lambda: self.move_car())
         move_button.pack()
 
+        hint_button = ttk.Button(master=self.master, text="Hint", command=lambda: self.show_hint())
+        hint_button.pack()
+
         # Create an instance of the Board class
         self.board = Board(self.gameboards[board_number][1])
         self.board.setup_board(self.gameboards[board_number][0])
+        self.table = DistanceTable.open_for(self.board)
 
         # Call the plot_information method on the board instance
         visualize(self.board, self.ax1, self.ax2)
@@ -176,6 +182,26 @@ class Interface:
 
         self.check_winner(car_name)
 
+    def show_hint(self):
+        """
+        Show the best next move, looked up in the distance table of the board.
+
+        Returns:
+        None
+        """
+        self.clear_labels()
+
+        if self.table is None:
+            self.display_text("No distance table for this board, build it with build_tables.py", error=True)
+            return
+
+        hint = self.table.hint(self.board)
+        if hint is None:
+            self.display_text("No hint available for this position", error=True)
+        else:
+            name, movement, moves_left = hint
+            self.display_text(f"Hint: {name},{movement} ({moves_left} moves left after this move)", message=True)
+
     def experiment(self, board_number, alg_type, visual):
         self.experimenttimes = []
         self.visual = visual
@@ -189,7 +215,10 @@ class Interface:
         for run in range(repeats):
              # Initialize variables
             self.iterations = 0
-            self.algorithm(board_number, alg_type)
+            if self.profiler is not None:
+                self.profiler.run(None, f'board{board_number}_run{run}', alg_type, self.algorithm, board_number, alg_type)
+            else:
+                self.algorithm(board_number, alg_type)
             self.display_text(f'{run/repeats}', message=True)
 
         df = pd.DataFrame(self.experimenttimes, columns=['time'], index=['Index_{}'.format(i) for i in range(1, len(self.experimenttimes)+1)])
@@ -228,12 +257,13 @@ class Interface:
         if alg_type == 'non-reverse':
             move = (None, 0, None)
         elif alg_type == 'breadth':
-            current_layer_boards = []
-            current_layer_index = None
-            former_layer_boards = [(self.board, (None, 0, None))]
-            former_layer_index = 0
-            move = (None, 0, None, current_layer_boards, current_layer_index, former_layer_boards, former_layer_index)
-            self.board: Board = copy.deepcopy(former_layer_boards[former_layer_index][0])
+            # Find the shortest solution first and replay it move by move
+            start_state = self.board.get_state()
+            if self.cache is not None:
+                solution = self.cache.solve(self.board, 'Breadth-first', lambda board: board.breadth_search()).moves
+            else:
+                solution = self.board.breadth_search().moves
+            self.board.set_state(start_state)
         elif alg_type == 'depth':
             bottom = 30
             history = Stack()
@@ -267,9 +297,10 @@ class Interface:
             elif alg_type == 'non-reverse':
                 move = random_without_reverse(self.board, move)
             elif alg_type == 'breadth':
-                move = breadth_search(move[3], move[4], move[5], move[6])
-                self.board: Board = copy.deepcopy(move[5][move[6]][0])
-                print(move)
+                if not solution:
+                    break
+                name, movement = solution.pop(0)
+                move = (name, movement, self.board.find_vehicle(name).moved_positions(movement))
             elif alg_type == 'depth':
                 move = depth_search(self.board, move[3], move[4], bottom)
 
@@ -282,10 +313,6 @@ class Interface:
             # Update the board 
             self.board.update_positions_set(vehicle, move[2])
 
-            # Update breadth-first search history
-            if alg_type == 'breadth':
-                move[3].append((self.board, (move[0], move[1], move[2])))
-
             # Check if the game is complete and calculate the time
             if self.visual == 'no visualisation':
                 runtime = self.check_winner(move[0], time.time() - start)
@@ -352,8 +379,12 @@ class Interface:
 
     def load_image(self, event=None):
         # Use self.image_var.get() to get the selected value
-        board_number = int(self.image_var.get()[-1])
+        board_number = int(self.image_var.get().split()[-1])
         path = f"data/gameboards_start_layout/game{board_number}.png"
+        # Boards from a puzzle pack have no picture of their start layout
+        if not os.path.exists(path):
+            self.image_label.config(image='')
+            return
 
         image = Image.open(path)
         image = image.resize((600, 300))
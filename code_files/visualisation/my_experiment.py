@@ -6,17 +6,32 @@ Author: Nanne Hempel
 """
 
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
 import time
+import tracemalloc
+import random
+import multiprocessing
 from datetime import datetime
 from ..classes.board_setup import Board as Board
-from tqdm import tqdm
+from ..algorithms.retrograde import retrograde_distances
+from ..algorithms.static_analysis import unsolvable_reason
+from ..classes.solution_cache import SolutionCache
+from ..classes.budget import Budget
+from ..classes.solver_stats import SolverStats
+from ..classes.puzzle_pack import PuzzlePack
 from itertools import product
+from contextlib import nullcontext
+
+
+# Names of the algorithms in the data
+ALGORITHM_NAMES = {'random': 'Random', 'no_reverse': 'No_reverse', 'breadth_first': 'Breadth-first', 'depth_first': 'Depth-first',
+                   'a_star': 'A*', 'bidirectional': 'Bidirectional', 'ida_star': 'IDA*'}
+
+# Values of solved for the part of the budget that ran out
+STOPPED_STATUS = {'nodes': 'Unsolved', 'time': 'Timeout', 'memory': 'Memory', 'memory_ceiling': 'Memory ceiling', 'cancelled': 'Cancelled'}
 
 
 class Experiment:
-    def __init__(self, size, num_cars, algorithms=[], size_range=1, num_cars_range=1, car_truck_ratio=(3,1), car_truck_range=(1,1), HV_ratio=(1,1), HV_ratio_range=(1,1), lock_limit=1, lock_limit_range=1, min_exit_distance=2, min_exit_distance_range=1, move_max=10000, num_runs=1000):
+    def __init__(self, size, num_cars, algorithms=[], size_range=1, num_cars_range=1, car_truck_ratio=(3,1), car_truck_range=(1,1), HV_ratio=(1,1), HV_ratio_range=(1,1), lock_limit=1, lock_limit_range=1, min_exit_distance=2, min_exit_distance_range=1, move_max=10000, num_runs=1000, heuristic='blocking', check_optimal=False, table_max=1000000, cache=None, jobs=1, seed=None, time_max=None, state_max=None, min_optimal=None, max_optimal=None, target_state_max=20000, target_attempts=100, duplicates=None, precheck=True, pack=None, stats=False, memory=False, memory_max=None, profiler=None):
         """
         Parameters
         ----------
@@ -35,6 +50,43 @@ class Experiment:
             min_exit_distance_range int : Range of the min exit distance.
             move_max int : Maximum number of moves. If exceeded, the board is considered unsolvable.
             num_runs int : Number of runs.
+            heuristic str : Heuristic of the A* and IDA* algorithms, 'blocking' or 'exit_distance'.
+            check_optimal bool : Enumerate all states of every board once, to store the
+            optimal number of moves and whether each algorithm found it.
+            table_max int : Maximum number of states to enumerate for check_optimal.
+            cache SolutionCache : Cache of the results of the search algorithms, None to always search.
+            jobs int : Number of processes that run the boards.
+            seed int : Seed of the experiment. Every board and algorithm gets its own seed derived
+            from it, so the results do not depend on the number of jobs. None for a random seed.
+            time_max float : Maximum number of seconds per algorithm, None for no limit.
+            If exceeded, solved is 'Timeout'.
+            state_max int : Maximum number of states an algorithm keeps in memory, None for no limit.
+            If exceeded, solved is 'Memory'.
+            min_optimal int : Only generate boards that can be won, with a shortest solution of at least this many moves.
+            max_optimal int : Only generate boards that can be won, with a shortest solution of at most this many moves.
+            target_state_max int : Maximum number of states of a layout generated for min_optimal and max_optimal.
+            target_attempts int : Maximum number of layouts to generate for min_optimal and max_optimal.
+            If no board is found, solved is 'Not generated'.
+            duplicates str : What to do with a board that is the same as an earlier board of the
+            experiment, up to the names of its vehicles: None to run it, 'skip' to store it without
+            running it, with solved 'Duplicate', or 'reuse' to copy the rows of the earlier board.
+            The saved work is in dedup_report.
+            precheck bool : Check every board for being provably unwinnable before running the
+            algorithms. Such boards are not run, and solved is 'Unsolvable'.
+            pack str : Path of a puzzle pack to run instead of generating boards. The first num_runs
+            puzzles are run, the size, number of cars and optimal number of moves are read from the
+            pack, and the lock limit and exit distance are stored as 0.
+            stats bool : Collect the SolverStats of every algorithm run and store them in the columns
+            of SolverStats.COLUMNS. Timing the phases of the algorithms slows them down.
+            memory bool : Measure the peak memory allocated by every algorithm run with tracemalloc,
+            stored in bytes in the peak_memory column. Tracing slows the algorithms down.
+            memory_max int : Maximum number of bytes an algorithm run allocates, None for no limit.
+            If exceeded, the run stops and solved is 'Memory ceiling'. The memory is measured
+            as with memory, which is switched on by it.
+            profiler RunProfiler : Profiles all algorithms on a sample of the boards, chosen by their
+            seed, None to run without profiling. The profiles are named after the board, puzzle<id>
+            for a pack or seed<seed> as in the seed column, and the profiled column marks their rows,
+            as profiling slows the algorithms down.
         """
         self.size = size
         self.size_range = size_range
@@ -50,37 +102,115 @@ class Experiment:
         self.min_exit_distance_range = min_exit_distance_range
         self.move_max = move_max
         self.num_runs = num_runs
+        self.heuristic = heuristic
+        self.check_optimal = check_optimal
+        self.table_max = table_max
+        self.cache = cache
+        self.jobs = jobs
+        self.seed = seed if seed is not None else random.randrange(2**32)
+        self.time_max = time_max
+        self.state_max = state_max
+        self.min_optimal = min_optimal
+        self.max_optimal = max_optimal
+        self.target_state_max = target_state_max
+        self.target_attempts = target_attempts
+        self.duplicates = duplicates
+        self.dedup_report = None
+        self.precheck = precheck
+        self.pack = pack
+        self.opened_pack = None
+        self.stats = stats
+        self.memory = memory or memory_max is not None
+        self.memory_max = memory_max
+        self.profiler = profiler
         self.df_data = pd.DataFrame(columns=['size', 'num_cars', 'algorithm', 'solved', 'lock_limit', 'moves'])
         pd.option_context('mode.use_inf_as_na', True)
         self.algorithms = algorithms if len(algorithms) != 0 else ['random', 'no_reverse', 'breadth_first', 'depth_first', 'a_star']
         self.unsolved = []
     
-    def breadth_first(self, size, state, cars, lock_lim, exit_dist):
-        breadth_board = Board(size)
-        breadth_board.setup_board(state)
-        start_time = time.time()  
-        try:
-            breadth_board.breadth_search(self.move_max)
-            solved = 'Solved' if breadth_board.won else 'Unsolved'
-        except ValueError:
+    def budget(self):
+        """Returns a new budget for one algorithm run, with the limits of the experiment."""
+        return Budget(self.move_max, self.time_max, self.state_max, self.memory_max)
+
+    def memory_start(self):
+        """
+        Starts measuring the peak memory of an algorithm run.
+
+        Returns
+        -------
+            baseline int : The bytes allocated before the run, None if memory is not measured.
+        """
+        if not self.memory:
+            return None
+        tracemalloc.reset_peak()
+        return tracemalloc.get_traced_memory()[0]
+
+    def peak_memory(self, baseline):
+        """Returns the peak bytes allocated since memory_start returned baseline, None if memory is not measured."""
+        if baseline is None:
+            return None
+        return tracemalloc.get_traced_memory()[1] - baseline
+
+    def search(self, algorithm, solve, size, state, cars, lock_lim, exit_dist, solver=None):
+        """
+        Runs one of the search algorithms that return a SolverResult and stores the data.
+        Solutions found before are taken from the cache, if there is one.
+
+        Parameters
+        ----------
+            algorithm str : Name of the algorithm in the data.
+            solve function : solve(board) runs the algorithm on a set up board.
+            solver str : Name of the algorithm in the cache, by default the same as algorithm.
+        """
+        search_board = Board(size)
+        search_board.setup_board(state)
+        memory = self.memory_start()
+        start_time = time.time()
+        if self.cache is not None:
+            result = self.cache.solve(search_board, solver or algorithm, solve)
+        else:
+            result = solve(search_board)
+        if result.solved:
+            solved = 'Solved'
+        # The search ran out of states before the budget, so there is no solution
+        elif result.stopped is None:
             solved = 'Locked'
-        end_time = time.time()  
-        self.data.append({'size': size, 'num_cars': cars, 'algorithm': 'Breadth-first', 'solved': solved, 'lock_limit': lock_lim, 'moves': breadth_board.iterations, 'time': f"{end_time - start_time:.6f}", 'move_max': self.move_max, 'car_truck_ratio': self.car_truck_ratio, 'HV_ratio': self.HV_ratio, 'min_exit_distance': exit_dist})
+        else:
+            solved = STOPPED_STATUS[result.stopped]
+        end_time = time.time()
+        self.data.append({'size': size, 'num_cars': cars, 'algorithm': algorithm, 'solved': solved, 'lock_limit': lock_lim, 'moves': search_board.iterations, 'time': f"{end_time - start_time:.6f}", 'move_max': self.move_max, 'car_truck_ratio': self.car_truck_ratio, 'HV_ratio': self.HV_ratio, 'min_exit_distance': exit_dist, 'solution_length': result.solution_length(), 'peak_frontier': result.peak_frontier, 'cached': result.cached, 'peak_memory': self.peak_memory(memory)})
+        if result.stats is not None:
+            self.data[-1].update(result.stats.as_dict())
         if solved != 'Solved':
-            self.unsolved.append({'Breadth-first': state})
+            self.unsolved.append({algorithm: state})
+
+    def breadth_first(self, size, state, cars, lock_lim, exit_dist):
+        self.search('Breadth-first', lambda board: board.breadth_search(budget=self.budget()), size, state, cars, lock_lim, exit_dist)
+
+    def bidirectional(self, size, state, cars, lock_lim, exit_dist):
+        self.search('Bidirectional', lambda board: board.bidirectional_search(budget=self.budget()), size, state, cars, lock_lim, exit_dist)
+
+    def ida_star(self, size, state, cars, lock_lim, exit_dist):
+        self.search('IDA*', lambda board: board.ida_star_solve(heuristic=self.heuristic, budget=self.budget()), size, state, cars, lock_lim, exit_dist, f'IDA* ({self.heuristic})')
+
+    def a_star(self, size, state, cars, lock_lim, exit_dist):
+        self.search('A*', lambda board: board.astar_solve(heuristic=self.heuristic, budget=self.budget()), size, state, cars, lock_lim, exit_dist, f'A* ({self.heuristic})')
 
 
     def depth_first(self, size, state, cars, lock_lim, exit_dist):
         depth_board = Board(size)
         depth_board.setup_board(state)
+        memory = self.memory_start()
         start_time = time.time()  
         try:
-            depth_board.depth_search(self.move_max)
-            solved = 'Solved' if depth_board.is_won() else 'Unsolved'
+            depth_board.depth_search(budget=self.budget())
+            solved = 'Solved' if depth_board.is_won() else STOPPED_STATUS[depth_board.stopped]
         except ValueError:
             solved = 'Locked'
         end_time = time.time()  
-        self.data.append({'size': size, 'num_cars': cars, 'algorithm': 'Depth-first', 'solved': solved, 'lock_limit': lock_lim, 'moves': depth_board.iterations, 'time': f"{end_time - start_time:.6f}", 'move_max': self.move_max, 'car_truck_ratio': self.car_truck_ratio, 'HV_ratio': self.HV_ratio, 'min_exit_distance': exit_dist})
+        self.data.append({'size': size, 'num_cars': cars, 'algorithm': 'Depth-first', 'solved': solved, 'lock_limit': lock_lim, 'moves': depth_board.iterations, 'time': f"{end_time - start_time:.6f}", 'move_max': self.move_max, 'car_truck_ratio': self.car_truck_ratio, 'HV_ratio': self.HV_ratio, 'min_exit_distance': exit_dist, 'peak_memory': self.peak_memory(memory)})
+        if depth_board.stats is not None:
+            self.data[-1].update(depth_board.stats.as_dict())
         if solved != 'Solved':
             self.unsolved.append({'Depth-first': state})
 
@@ -88,35 +218,200 @@ class Experiment:
     def randomise(self, size, state, cars, lock_lim, exit_dist):
         random_board = Board(size)
         random_board.setup_board(state)
+        memory = self.memory_start()
         start_time = time.time()
         try:
-            random_board.random_solve(self.move_max)
-            solved = 'Solved' if random_board.is_won() else 'Unsolved'
+            random_board.random_solve(budget=self.budget())
+            solved = 'Solved' if random_board.is_won() else STOPPED_STATUS[random_board.stopped]
         except ValueError:
             solved = 'Locked'
         end_time = time.time()
-        self.data.append({'size': size, 'num_cars': cars, 'algorithm': 'Random', 'solved': solved, 'lock_limit': lock_lim, 'moves': random_board.iterations, 'time': f"{end_time - start_time:.6f}", 'move_max': self.move_max, 'car_truck_ratio': self.car_truck_ratio, 'HV_ratio': self.HV_ratio, 'min_exit_distance': exit_dist})
+        self.data.append({'size': size, 'num_cars': cars, 'algorithm': 'Random', 'solved': solved, 'lock_limit': lock_lim, 'moves': random_board.iterations, 'time': f"{end_time - start_time:.6f}", 'move_max': self.move_max, 'car_truck_ratio': self.car_truck_ratio, 'HV_ratio': self.HV_ratio, 'min_exit_distance': exit_dist, 'peak_memory': self.peak_memory(memory)})
+        if random_board.stats is not None:
+            self.data[-1].update(random_board.stats.as_dict())
         if solved != 'Solved':
             self.unsolved.append({'Random': state})
 
     def no_reverse(self, size, state, cars, lock_lim, exit_dist):
         no_reverse_board = Board(size)
         no_reverse_board.setup_board(state)
+        memory = self.memory_start()
         start_time = time.time()
         try:
-            no_reverse_board.no_reverse_solve(self.move_max)
-            solved = 'Solved' if no_reverse_board.is_won() else 'Unsolved'
+            no_reverse_board.no_reverse_solve(budget=self.budget())
+            solved = 'Solved' if no_reverse_board.is_won() else STOPPED_STATUS[no_reverse_board.stopped]
         except ValueError:
             solved = 'Locked'
         end_time = time.time()
-        self.data.append({'size': size, 'num_cars': cars, 'algorithm': 'No_reverse', 'solved': solved, 'lock_limit': lock_lim, 'moves': no_reverse_board.iterations, 'time': f"{end_time - start_time:.6f}", 'move_max': self.move_max, 'car_truck_ratio': self.car_truck_ratio, 'HV_ratio': self.HV_ratio, 'min_exit_distance': exit_dist})
+        self.data.append({'size': size, 'num_cars': cars, 'algorithm': 'No_reverse', 'solved': solved, 'lock_limit': lock_lim, 'moves': no_reverse_board.iterations, 'time': f"{end_time - start_time:.6f}", 'move_max': self.move_max, 'car_truck_ratio': self.car_truck_ratio, 'HV_ratio': self.HV_ratio, 'min_exit_distance': exit_dist, 'peak_memory': self.peak_memory(memory)})
+        if no_reverse_board.stats is not None:
+            self.data[-1].update(no_reverse_board.stats.as_dict())
         if solved != 'Solved':
             self.unsolved.append({'No_reverse': state})
 
+    def optimal_moves(self, size, state):
+        """
+        Finds the optimal number of moves of a board by enumerating all its states.
+
+        Returns
+        -------
+            moves int : The optimal number of moves, -1 if the board cannot be won
+            or None if it has more than table_max states.
+        """
+        board = Board(size)
+        board.setup_board(state)
+        try:
+            distances, _ = retrograde_distances(board, self.table_max)
+        except ValueError:
+            return None
+        return distances.get(board.get_state(), -1)
+
+    def task_seed(self, *task):
+        """
+        Derives the seed of a task from the seed of the experiment.
+
+        Parameters
+        ----------
+            task : The values that identify the task, like the run number and the board settings.
+
+        Returns
+        -------
+            seed int : A seed that only depends on the experiment seed and the task.
+        """
+        # Seeding with a string hashes it with SHA-512, which unlike hash() is the same in every process
+        return random.Random(':'.join(map(str, (self.seed,) + task))).randrange(2**32)
+
+    def generate_board(self, task):
+        """
+        Generates the board of a task from the seed of the task, or reads it from the puzzle pack.
+
+        Parameters
+        ----------
+            task tuple : (run, size, cars, lock_lim, exit_dist) of the board, with a pack run is the puzzle id.
+
+        Returns
+        -------
+            initial_state pd.DataFrame : Initial state of the board, None if no board with
+            the optimal number of moves between min_optimal and max_optimal was found.
+            optimal_moves int : Optimal number of moves if it is known, otherwise None.
+        """
+        if self.pack is not None:
+            pack = self.puzzle_pack()
+            return pack.frame(task[0]), pack.info(task[0])[2]
+
+        _, size, cars, lock_lim, exit_dist = task
+        random.seed(self.task_seed(*task))
+        if self.min_optimal is not None or self.max_optimal is not None:
+            try:
+                return Board.solvable_board_df(size, cars, self.car_truck_ratio, lock_lim, exit_dist, self.HV_ratio,
+                                               self.min_optimal or 1, self.max_optimal, self.target_state_max, self.target_attempts)
+            except ValueError:
+                return None, None
+        return Board.random_board_df(size, cars, self.car_truck_ratio, lock_lim, exit_dist, self.HV_ratio), None
+
+    def skipped_rows(self, task, completed, solved):
+        """
+        Returns the rows of a board that is not given to the algorithms.
+
+        Parameters
+        ----------
+            task tuple : (run, size, cars, lock_lim, exit_dist) of the board.
+            completed set : Names of the algorithms that already ran on this board, these are left out.
+            solved str : Why the board is skipped, stored in the solved column.
+        """
+        _, size, cars, lock_lim, exit_dist = task
+        seed = self.task_seed(*task)
+        return [{'size': size, 'num_cars': cars, 'algorithm': ALGORITHM_NAMES[algorithm], 'solved': solved, 'lock_limit': lock_lim, 'moves': 0, 'time': f"{0:.6f}", 'move_max': self.move_max, 'car_truck_ratio': self.car_truck_ratio, 'HV_ratio': self.HV_ratio, 'min_exit_distance': exit_dist, 'seed': seed, 'experiment_seed': self.seed}
+                for algorithm in self.algorithms if ALGORITHM_NAMES[algorithm] not in completed]
+
+    def run_board(self, task, completed=(), board=None):
+        """
+        Generates one board and runs all algorithms on it.
+
+        Parameters
+        ----------
+            task tuple : (run, size, cars, lock_lim, exit_dist) of the board.
+            completed set : Names of the algorithms that already ran on this board, these are skipped.
+            board tuple : The board of the task from generate_board, None to generate it.
+
+        Returns
+        -------
+            data list : The rows of the algorithms.
+            unsolved list : The boards the algorithms did not solve.
+        """
+        self.data = []
+        self.unsolved = []
+        seed = self.task_seed(*task)
+        _, size, cars, lock_lim, exit_dist = task
+        # Set in every run, as the workers may not share the class of this process
+        SolverStats.enabled = self.stats
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+        initial_state, optimal_moves = board if board is not None else self.generate_board(task)
+        if initial_state is None:
+            # Record the board as not generated, so it is not lost and skipped when resuming
+            self.data = self.skipped_rows(task, completed, 'Not generated')
+            return self.data, self.unsolved
+
+        # Boards that provably cannot be won are not given to the algorithms
+        if self.precheck:
+            check_board = Board(size)
+            check_board.setup_board(initial_state)
+            if unsolvable_reason(check_board) is not None:
+                self.data = self.skipped_rows(task, completed, 'Unsolvable')
+                if self.check_optimal:
+                    for row in self.data:
+                        row['optimal_moves'] = -1
+                self.unsolved = [{row['algorithm']: initial_state} for row in self.data]
+                return self.data, self.unsolved
+
+        runners = {'random': self.randomise, 'no_reverse': self.no_reverse, 'breadth_first': self.breadth_first, 'depth_first': self.depth_first,
+                   'a_star': self.a_star, 'bidirectional': self.bidirectional, 'ida_star': self.ida_star}
+        profiled = self.profiler is not None and self.profiler.sampled(seed)
+        board_id = f'puzzle{task[0]}' if self.pack is not None else f'seed{seed}'
+        for algorithm in self.algorithms:
+            if ALGORITHM_NAMES[algorithm] in completed:
+                continue
+            random.seed(self.task_seed(seed, algorithm))
+            if profiled:
+                self.profiler.profile(board_id, ALGORITHM_NAMES[algorithm], runners[algorithm], size, initial_state, cars, lock_lim, exit_dist)
+            else:
+                runners[algorithm](size, initial_state, cars, lock_lim, exit_dist)
+
+        # Compare the solutions of this board with its optimal number of moves
+        if self.check_optimal and optimal_moves is None:
+            optimal_moves = self.optimal_moves(size, initial_state)
+        if self.check_optimal or optimal_moves is not None:
+            for row in self.data:
+                row['optimal_moves'] = optimal_moves
+                if row.get('solution_length') is not None:
+                    row['optimal'] = row['solution_length'] == optimal_moves
+
+        for row in self.data:
+            row['seed'] = seed
+            row['experiment_seed'] = self.seed
+            if self.profiler is not None:
+                row['profiled'] = profiled
+        return self.data, self.unsolved
+
+    def __getstate__(self):
+        # A database connection and a memory map cannot be pickled, the workers open their own
+        state = self.__dict__.copy()
+        state['data'] = []
+        state['unsolved'] = []
+        state['df_data'] = None
+        state['cache'] = None
+        state['opened_pack'] = None
+        return state
+
     def histogram(self):
         pass
 
     def lmplot(self):
+        import matplotlib.pyplot as plt
+        import seaborn as sns
+
         plt.clf()
         sns.set_theme(style="darkgrid")
         sns.lmplot(data=self.df_data, x="moves", y="time",
@@ -124,6 +419,9 @@ class Experiment:
         plt.savefig("lmplot_test_data.png")
     
     def catplot(self):
+        import matplotlib.pyplot as plt
+        import seaborn as sns
+
         plt.clf()
         sns.set_theme(style="darkgrid")
         sns.catplot(data=self.df_data, x="algorithm", y="moves", hue="solved", kind="bar")
@@ -153,29 +451,193 @@ class Experiment:
         df.to_csv(new_path)
         
 
-    def run(self):
-        self.data = []
+    def puzzle_pack(self):
+        """Returns the puzzle pack of the experiment, it is opened the first time it is used in a process."""
+        if self.opened_pack is None:
+            self.opened_pack = PuzzlePack(self.pack)
+        return self.opened_pack
+
+    def tasks(self):
+        """Returns the (run, size, cars, lock_lim, exit_dist) of every board of the experiment, in order."""
+        if self.pack is not None:
+            pack = self.puzzle_pack()
+            return [(puzzle_id,) + pack.info(puzzle_id)[:2] + (0, 0) for puzzle_id in range(min(self.num_runs, len(pack)))]
+
         sizes = range(self.size, self.size + self.size_range)
         cars_range = range(self.num_cars, self.num_cars + self.num_cars_range)
         lock_limits = range(self.lock_limit, self.lock_limit + self.lock_limit_range)
         exit_distances = range(self.min_exit_distance, self.min_exit_distance + self.size_range)
+        return [(i,) + settings for i in range(self.num_runs) for settings in product(sizes, cars_range, lock_limits, exit_distances)]
+
+    def run(self, writer=None):
+        """
+        Runs all boards of the experiment.
+
+        Parameters
+        ----------
+            writer ResultWriter : Writes the rows to disk while running instead of keeping them
+            in df_data. Boards and algorithms that are already in its file are skipped.
+        """
+        names = {ALGORITHM_NAMES[algorithm] for algorithm in self.algorithms}
+        tasks = []
+        for task in self.tasks():
+            seed = self.task_seed(*task)
+            completed = {name for name in names if writer is not None and (seed, name) in writer.completed}
+            # Finished boards can be the first copy of a board that is not finished yet
+            if completed != names or self.duplicates is not None:
+                tasks.append((task, completed))
 
-        for i in tqdm(range(self.num_runs)):
-            for size, cars, lock_lim, exit_dist in product(sizes, cars_range, lock_limits, exit_distances):
-                initial_state = Board.random_board_df(size, cars, self.car_truck_ratio, lock_lim, exit_dist, self.HV_ratio)
-                for algorithm in self.algorithms:
-                    if algorithm == 'random':
-                        self.randomise(size, initial_state, cars, lock_lim, exit_dist)
-                    elif algorithm == 'no_reverse':
-                        self.no_reverse(size, initial_state, cars, lock_lim, exit_dist)
-                    elif algorithm == 'breadth_first':
-                        self.breadth_first(size, initial_state, cars, lock_lim, exit_dist)
-                    elif algorithm == 'depth_first':
-                        self.depth_first(size, initial_state, cars, lock_lim, exit_dist)
+        from tqdm import tqdm
 
-        self.df_data = pd.DataFrame(self.data)
+        data = []
+        unsolved = []
+        enabled = SolverStats.enabled
+        tracing = tracemalloc.is_tracing()
+        # The workers get a copy of the experiment once and return the boards in order
+        pool = multiprocessing.Pool(self.jobs, initializer=_init_worker, initargs=(self, self.cache_settings())) if self.jobs > 1 else nullcontext()
+        with pool:
+            plan = self.deduplicate(tasks, pool) if self.duplicates is not None else [task + (None, None) for task in tasks]
+            runs = [(task, completed, board) for task, completed, board, first in plan if first is None and completed != names]
+            if self.jobs > 1:
+                results = pool.imap(_run_board, runs)
+            else:
+                results = (self.run_board(*run) for run in runs)
+            results = iter(tqdm(results, total=len(runs)))
+            self.collect(self.fill_duplicates(plan, results, writer), data, unsolved, writer)
+        # run_board switches the stats and memory tracing on for the experiment, also in this process
+        SolverStats.enabled = enabled
+        if not tracing and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+        self.data = data
+        self.unsolved = unsolved
+        self.df_data = pd.DataFrame(self.data) if writer is None else None
+        if self.dedup_report is not None:
+            report = self.dedup_report
+            print(f"{report['duplicates']} of {report['boards']} boards were duplicates, "
+                  f"saved {report['saved_runs']} algorithm runs and {report['saved_time']:.2f} seconds")
+        if self.profiler is not None:
+            print(f"Profiles of 1 in {self.profiler.every} boards written to {self.profiler.directory}")
+
+    def cache_settings(self):
+        """Returns the arguments to open the cache again in a worker, None without a cache."""
+        return (self.cache.path, self.cache.max_entries) if self.cache is not None else None
+
+    def deduplicate(self, tasks, pool):
+        """
+        Generates the boards of the tasks and finds the boards that are the same as an earlier
+        board, up to the names of the vehicles. The boards are generated from the seeds of their
+        tasks, so they are the same as when run_board generates them.
+
+        Parameters
+        ----------
+            tasks list : (task, completed) of the boards, in order, including the boards that
+            are finished already, since a later copy of them is a duplicate too.
+            pool multiprocessing.Pool : Workers to generate the boards, or a nullcontext to generate them here.
+
+        Returns
+        -------
+            plan list : (task, completed, board, first) of the boards, in order. first is the index
+            in the plan of the earlier board for duplicates, and None for boards to run.
+        """
+        task_list = [task for task, _ in tasks]
+        boards = pool.map(_generate_board, task_list) if self.jobs > 1 else [self.generate_board(task) for task in task_list]
+
+        plan = []
+        firsts = {}
+        for (task, completed), board in zip(tasks, boards):
+            initial_state, _ = board
+            first = None
+            if initial_state is not None:
+                canonical_board = Board(task[1])
+                canonical_board.setup_board(initial_state)
+                key = canonical_board.canonical_hash()
+                first = firsts.get(key)
+                if first is None:
+                    firsts[key] = len(plan)
+            plan.append((task, completed, board, first))
+
+        pending = [(completed, first) for _, completed, _, first in plan if len(completed) < len(self.algorithms)]
+        duplicates = [completed for completed, first in pending if first is not None]
+        self.dedup_report = {'boards': len(pending), 'duplicates': len(duplicates),
+                             'saved_runs': sum(len(self.algorithms) - len(completed) for completed in duplicates), 'saved_time': 0.0}
+        return plan
+
+    def fill_duplicates(self, plan, results, writer=None):
+        """
+        Yields the results of the boards of the plan in order, leaving out the boards that are
+        finished already. Duplicates get a row per algorithm with solved 'Duplicate' with duplicates
+        'skip', and a copy of the rows of the earlier board with 'reuse'. Either way they are
+        finished when the experiment is resumed.
+
+        Parameters
+        ----------
+            plan list : The plan from deduplicate.
+            results iterable : The (rows, unsolved) of the boards of the plan that are run, in order.
+            writer ResultWriter : The file of a resumed experiment, it has the rows of the earlier
+            boards that were finished before.
+        """
+        total = len(self.algorithms)
+        earlier_seeds = {self.task_seed(*plan[first][0]) for _, completed, _, first in plan
+                         if first is not None and len(completed) < total and plan[first][1]}
+        earlier = writer.read_rows(earlier_seeds) if writer is not None and earlier_seeds else {}
+
+        firsts = {first for *_, first in plan if first is not None}
+        rows_of = {}
+        for index, (task, completed, board, first) in enumerate(plan):
+            if len(completed) == total:
+                continue
+            if first is None:
+                rows, boards = next(results)
+                if index in firsts:
+                    rows_of[index] = rows
+                if self.duplicates is not None:
+                    for row in rows:
+                        row['duplicate'] = False
+                yield rows, boards
+                continue
+
+            # The earlier board has rows from before a resume and from this run
+            first_task, _, _, _ = plan[first]
+            first_rows = {row['algorithm']: row for row in earlier.get(self.task_seed(*first_task), [])}
+            first_rows.update((row['algorithm'], row) for row in rows_of.get(first, []))
+            rows = [first_rows[ALGORITHM_NAMES[algorithm]] for algorithm in self.algorithms
+                    if ALGORITHM_NAMES[algorithm] not in completed]
+            self.dedup_report['saved_time'] += sum(float(row['time']) for row in rows)
+            if self.duplicates == 'reuse':
+                seed = self.task_seed(*task)
+                yield [dict(row, seed=seed, duplicate=True) for row in rows], []
+            else:
+                yield [dict(row, duplicate=True) for row in self.skipped_rows(task, completed, 'Duplicate')], []
+
+    def collect(self, results, data, unsolved, writer):
+        """Adds the rows of the boards to data or the writer, and their unsolved boards to unsolved."""
+        for rows, boards in results:
+            if writer is not None:
+                writer.write(rows)
+            else:
+                data.extend(rows)
+            unsolved.extend(boards)
 
 
     def export(self):
         pass
 
+
+_worker_experiment = None
+
+
+def _init_worker(experiment, cache):
+    global _worker_experiment
+    _worker_experiment = experiment
+    # A forked worker shares the connection of the parent, which SQLite does not allow,
+    # so every worker opens the cache again
+    _worker_experiment.cache = SolutionCache(*cache) if cache is not None else None
+
+
+def _run_board(task):
+    return _worker_experiment.run_board(*task)
+
+
+def _generate_board(task):
+    return _worker_experiment.generate_board(task)
@@ -0,0 +1,160 @@
+"""
+This script imports, exports and solves puzzle databases in the one-line format,
+like the public Rush Hour databases with the optimal number of moves of every puzzle.
+
+The files are read one line at a time, so databases with millions of puzzles are
+handled without loading them. Boards with walls ('x') are skipped, as the Board
+class has no walls.
+
+import converts a database to a puzzle pack, export writes a pack or database
+as a database. solve runs a search algorithm over a database or pack in chunks,
+and compares the solution lengths with the optimal number of moves of the puzzles.
+A summary is printed after every chunk.
+
+Usage:
+    python corpus.py import <database> -o <pack>
+    python corpus.py export <pack or database> -o <database>
+    python corpus.py solve <pack or database> [optional arguments]
+
+Optional arguments of solve:
+    -a, --algorithm <breadth_first|bidirectional|a_star|ida_star>
+    -hr, --heuristic <blocking|exit_distance>
+    -cs, --chunk_size <chunk_size>
+    -n, --limit <puzzles>
+    -mm, --move_max <move_max>
+    -t, --time_max <seconds>
+    -j, --jobs <jobs>
+"""
+
+import argparse
+import multiprocessing
+import time
+from contextlib import nullcontext
+from itertools import islice
+
+from code_files.classes.board_setup import Board
+from code_files.classes.budget import Budget
+from code_files.classes.puzzle_lines import read_puzzles, write_puzzles, chunks
+from code_files.classes.puzzle_pack import PuzzlePack
+from code_files.algorithms.solvers import SOLVERS, solve
+
+
+def open_puzzles(path, skipped):
+    """
+    Reads the puzzles of a pack or a database one at a time.
+
+    Parameters
+    ----------
+        path str : Path to a pack (.pack) or a database in the one-line format.
+        skipped list : The line numbers of boards with walls are added to it.
+
+    Returns
+    -------
+        puzzles iterator : (size, records, optimal) of every puzzle.
+    """
+    if path.endswith('.pack'):
+        return PuzzlePack(path).puzzles()
+    return read_puzzles(path, skipped)
+
+
+def solve_puzzle(puzzle, algorithm, heuristic, move_max, time_max):
+    """
+    Solves one puzzle.
+
+    Returns
+    -------
+        result tuple : (solution length or None, optimal number of moves, expanded states, seconds, why it stopped).
+    """
+    size, records, optimal = puzzle
+    board = Board(size)
+    board.setup_vehicles(records)
+    result = solve(board, algorithm, heuristic, Budget(move_max, time_max))
+    return result.solution_length(), optimal, result.nodes_expanded, result.runtime, result.stopped
+
+
+def _solve_puzzle(task):
+    return solve_puzzle(*task)
+
+
+def solve_corpus(args):
+    """Solves the puzzles of args.path chunk by chunk and prints how many match their optimal number of moves."""
+    skipped = []
+    puzzles = islice(open_puzzles(args.path, skipped), args.limit)
+    totals = {'puzzles': 0, 'solved': 0, 'optimal': 0, 'differ': 0, 'stopped': 0, 'seconds': 0.0}
+    differ = []
+
+    pool = multiprocessing.Pool(args.jobs) if args.jobs > 1 else nullcontext()
+    with pool:
+        for number, chunk in enumerate(chunks(puzzles, args.chunk_size)):
+            start_time = time.perf_counter()
+            tasks = [(puzzle, args.algorithm, args.heuristic, args.move_max, args.time_max) for puzzle in chunk]
+            results = pool.map(_solve_puzzle, tasks) if args.jobs > 1 else [solve_puzzle(*task) for task in tasks]
+
+            counts = {'solved': 0, 'optimal': 0, 'differ': 0, 'stopped': 0}
+            for index, (length, optimal, _, _, stopped) in enumerate(results):
+                counts['solved'] += length is not None
+                counts['stopped'] += stopped is not None
+                if optimal is not None and (length is not None or stopped is None):
+                    # A search that finished without a solution proves the board cannot be won, optimal -1
+                    if (length if length is not None else -1) == optimal:
+                        counts['optimal'] += 1
+                    else:
+                        counts['differ'] += 1
+                        differ.append((totals['puzzles'] + index, length, optimal))
+
+            seconds = time.perf_counter() - start_time
+            for key, count in counts.items():
+                totals[key] += count
+            totals['puzzles'] += len(chunk)
+            totals['seconds'] += seconds
+            print(f"Chunk {number}: {len(chunk)} puzzles, {counts['solved']} solved, {counts['optimal']} match the optimal, "
+                  f"{counts['differ']} differ, {counts['stopped']} stopped, {seconds:.1f} seconds")
+
+    print(f"Total: {totals['puzzles']} puzzles, {totals['solved']} solved, {totals['optimal']} match the optimal, "
+          f"{totals['differ']} differ, {totals['stopped']} stopped, {totals['seconds']:.1f} seconds")
+    if skipped:
+        print(f"{len(skipped)} boards with walls skipped")
+    for puzzle, length, optimal in differ[:20]:
+        print(f"Puzzle {puzzle}: solved in {length} moves, the optimal is {optimal}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import, export and solve puzzle databases in the one-line format.")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    import_parser = commands.add_parser('import', help='Convert a database to a puzzle pack')
+    import_parser.add_argument('path', help='Database in the one-line format')
+    import_parser.add_argument('-o', '--output', required=True, help='Path of the pack')
+
+    export_parser = commands.add_parser('export', help='Write a pack or database as a database')
+    export_parser.add_argument('path', help='Pack (.pack) or database')
+    export_parser.add_argument('-o', '--output', required=True, help='Path of the database')
+
+    solve_parser = commands.add_parser('solve', help='Solve a pack or database in chunks and compare with the optimal number of moves')
+    solve_parser.add_argument('path', help='Pack (.pack) or database')
+    solve_parser.add_argument('-a', '--algorithm', choices=sorted(SOLVERS), default='bidirectional', help='Search algorithm (default: bidirectional)')
+    solve_parser.add_argument('-hr', '--heuristic', choices=['blocking', 'exit_distance'], default='blocking', help='Heuristic of A* and IDA* (default: blocking)')
+    solve_parser.add_argument('-cs', '--chunk_size', type=int, default=1000, help='Number of puzzles per chunk (default: 1000)')
+    solve_parser.add_argument('-n', '--limit', type=int, default=None, help='Only solve the first puzzles (default: all)')
+    solve_parser.add_argument('-mm', '--move_max', type=int, default=None, help='Maximum number of states to expand per puzzle (default: no limit)')
+    solve_parser.add_argument('-t', '--time_max', type=float, default=None, help='Maximum number of seconds per puzzle (default: no limit)')
+    solve_parser.add_argument('-j', '--jobs', type=int, default=1, help='Number of processes that solve the puzzles of a chunk (default: 1)')
+
+    args = parser.parse_args()
+    if args.command == 'solve':
+        solve_corpus(args)
+        return
+
+    skipped = []
+    puzzles = open_puzzles(args.path, skipped)
+    if args.command == 'import':
+        count = len(PuzzlePack.write(args.output, puzzles))
+    else:
+        count = write_puzzles(args.output, puzzles)
+    print(f"{count} puzzles written to {args.output}")
+    if skipped:
+        print(f"{len(skipped)} boards with walls skipped")
+
+
+if __name__ == "__main__":
+    main()
@@ -19,6 +19,7 @@ The results of the experiment are then gathered and can be used for visualizatio
 
 Usage:
     python gather_data.py -r <num_runs> -s <size> -c <num_cars> [optional arguments]
+    python gather_data.py -r <num_runs> --pack <path> [optional arguments]
 
 Optional arguments:
     -sr, --size_range <size_range>
@@ -30,23 +31,44 @@ Optional arguments:
     -m, --min_exit_distance <min_exit_distance>
     -mr, --min_exit_distance_range <min_exit_distance_range>
     -mm, --move_max <move_max>
+    -t, --time_max <seconds>
+    -sm, --state_max <state_max>
+    --memory
+    -mx, --memory_max <megabytes>
+    -co, --check_optimal
+    --min-optimal <moves>
+    --max-optimal <moves>
+    --no-cache
+    --duplicates <skip|reuse>
+    --no-precheck
+    --stats
+    --pack <path>
+    --profile [<every>]
+    -j, --jobs <jobs>
+    -sd, --seed <seed>
+    -o, --output <path>
+    --resume
 
 Author: Nanne Hempel
 """
 
 
 from code_files.visualisation.my_experiment import Experiment
+from code_files.classes.solution_cache import SolutionCache
+from code_files.classes.result_writer import ResultWriter
+from code_files.classes.profiler import RunProfiler
 import datetime
 import argparse
+import os
 
 
 
 def main():
     parser = argparse.ArgumentParser(description="Run the experiment with given parameters.")
     parser.add_argument('-r', '--num_runs', type=int, required=True, help='Number of runs (default: 1000)')
-    parser.add_argument('-s', '--size', type=int, required=True, help='Size of the board')
+    parser.add_argument('-s', '--size', type=int, default=None, help='Size of the board, required without --pack')
     parser.add_argument('-sr', '--size_range', type=int, default=1, help='Range of the size of the board (default: 1)')
-    parser.add_argument('-c', '--num_cars', type=int, required=True, help='Number of cars on the board')
+    parser.add_argument('-c', '--num_cars', type=int, default=None, help='Number of cars on the board, required without --pack')
     parser.add_argument('-cr', '--num_cars_range', type=int, default=1, help='Range of the number of cars (default: 1)')
     parser.add_argument('-ctr', '--car_truck_ratio', type=int, nargs=2, default=[3, 1], help='Ratio of cars to trucks (default: 3,1)')
     parser.add_argument('-hv', '--HV_ratio', type=int, nargs=2, default=[1, 1], help='Ratio of horizontal to vertical cars (default: 1,1)')
@@ -56,7 +78,34 @@ def main():
     parser.add_argument('-mr', '--min_exit_distance_range', type=int, default=1, help='Range of the min exit distance (default: 1)')
     parser.add_argument('-mm', '--move_max', type=int, default=2500, help='Maximum number of moves. If exceeded, the board is considered unsolvable (default: 2500)')
 
+    parser.add_argument('-t', '--time_max', type=float, default=None, help="Maximum number of seconds per algorithm. If exceeded, the board is marked 'Timeout' (default: no limit)")
+    parser.add_argument('-sm', '--state_max', type=int, default=None, help="Maximum number of states an algorithm keeps in memory. If exceeded, the board is marked 'Memory' (default: no limit)")
+    parser.add_argument('--memory', action='store_true', help='Store the peak memory of every algorithm run, measured with tracemalloc (slower)')
+    parser.add_argument('-mx', '--memory_max', type=float, default=None, help="Maximum number of megabytes an algorithm run allocates. If exceeded, the run stops and the board is marked 'Memory ceiling' (default: no limit)")
+    parser.add_argument('-co', '--check_optimal', action='store_true', help='Enumerate all states of every board to store the optimal number of moves')
+    parser.add_argument('-j', '--jobs', type=int, default=1, help='Number of processes that run the boards (default: 1)')
+    parser.add_argument('-sd', '--seed', type=int, default=None, help='Seed of the experiment, the results are the same for any number of jobs (default: random)')
+    parser.add_argument('-o', '--output', default=None, help='CSV file the results are written to while running (default: data/experiment/<settings>:<date>.csv)')
+    parser.add_argument('--resume', action='store_true', help='Continue the experiment in the output file, skipping the boards and algorithms it already contains')
+    parser.add_argument('--min-optimal', dest='min_optimal', type=int, default=None, help='Only run boards that can be won, with a shortest solution of at least this many moves')
+    parser.add_argument('--max-optimal', dest='max_optimal', type=int, default=None, help='Only run boards that can be won, with a shortest solution of at most this many moves')
+    parser.add_argument('--no-cache', dest='no_cache', action='store_true', help='Always run the search algorithms instead of reusing solutions from data/solution_cache.sqlite, for timing runs')
+    parser.add_argument('--duplicates', choices=['skip', 'reuse'], default=None, help="Boards that are the same as an earlier board up to the names of the vehicles get rows with solved 'Duplicate' ('skip') or the rows of the earlier board ('reuse') (default: run them)")
+    parser.add_argument('--no-precheck', dest='no_precheck', action='store_true', help="Run the algorithms on boards that are provably unwinnable, instead of storing them as 'Unsolvable'")
+    parser.add_argument('--stats', action='store_true', help='Store the states generated, expanded and seen twice, the branching factor, the states stored and the time of the move generation, state updates and goal tests of every run (slower)')
+    parser.add_argument('--profile', type=int, nargs='?', const=1, default=None, metavar='EVERY', help='Profile the algorithms on 1 in EVERY boards with cProfile, written to data/profiles/<algorithm>/ (default: 1 when given)')
+    parser.add_argument('--pack', default=None, help='Run the first num_runs puzzles of a pack made by pack_boards.py instead of generating boards')
+
     args = parser.parse_args()
+    if args.pack is None and (args.size is None or args.num_cars is None):
+        parser.error('the size (-s) and number of cars (-c) are required without --pack')
+    if args.resume and args.output is None:
+        parser.error('--resume needs the output file of the experiment, given with -o')
+
+    date = datetime.datetime.now().strftime("%m-%d_%H:%M")
+    name = os.path.splitext(os.path.basename(args.pack))[0] if args.pack else f'{args.size}_{args.num_cars}-{args.num_cars + args.num_cars_range}'
+    path = args.output or f'data/experiment/{name}:{date}.csv'
+    writer = ResultWriter(path, resume=args.resume)
 
     experiment = Experiment(
         num_runs=args.num_runs,
@@ -70,16 +119,31 @@ def main():
         lock_limit_range=args.lock_limit_range,
         min_exit_distance=args.min_exit_distance,
         min_exit_distance_range=args.min_exit_distance_range,
-        move_max=args.move_max
+        move_max=args.move_max,
+        check_optimal=args.check_optimal,
+        cache=None if args.no_cache else SolutionCache(),
+        jobs=args.jobs,
+        time_max=args.time_max,
+        state_max=args.state_max,
+        min_optimal=args.min_optimal,
+        max_optimal=args.max_optimal,
+        duplicates=args.duplicates,
+        precheck=not args.no_precheck,
+        pack=args.pack,
+        stats=args.stats,
+        memory=args.memory,
+        profiler=RunProfiler(args.profile) if args.profile else None,
+        memory_max=int(args.memory_max * 2**20) if args.memory_max is not None else None,
+        seed=args.seed if args.seed is not None else writer.experiment_seed
     )
 
-    experiment.run()
-
-    date = datetime.datetime.now().strftime("%m-%d_%H:%M")
-    experiment.save(f'data/experiment/{args.size}_{args.num_cars}-{args.num_cars + args.num_cars_range}:{date}.csv')
+    print(f"Seed: {experiment.seed}")
+    with writer:
+        experiment.run(writer)
+    print(f"Results written to {path}")
 
     if input("Do you want to save the unsolved boards? (y/n) ") == 'y':
-        experiment.save_unsolved(f'data/experiment/unsolved_{args.size}_{args.num_cars}-{args.num_cars + args.num_cars_range}:{date}.csv')
+        experiment.save_unsolved(f'data/experiment/unsolved_{name}:{date}.csv')
     print("Experiment finished.")
 
 
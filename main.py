@@ -1,26 +1,38 @@
-from code_files.visualisation.interface import Interface as Interface
+from code_files.classes.solution_cache import SolutionCache
+from code_files.classes.gameboards import board_size
+from code_files.classes.puzzle_pack import PuzzlePack
+from code_files.classes.profiler import RunProfiler
+import argparse
 import os
-import pandas as pd
-import tkinter as tk
 
-def main(gameboards):
+def main(gameboards, cache=None, profiler=None):
+    # The interface pulls in tkinter and matplotlib, so it is only imported when it is opened
+    import tkinter as tk
+    from code_files.visualisation.interface import Interface as Interface
+
     root = tk.Tk()
-    Interface(root, gameboards)
+    Interface(root, gameboards, cache, profiler)
     root.mainloop()
 
 def open_gameboards():
+    import pandas as pd
+
     # Saves the boards in a list. 
     gameboards = []
     path = os.path.join(os.getcwd(), 'data/gameboards')
     for filename in os.listdir(path):
-        size = int(filename[8])
-        if size == 1:
-            size = 12
+        size = board_size(filename)
         board_df = pd.read_csv(os.path.join(path, filename))
         board_df.set_index('car', inplace=True)
         gameboards.append((board_df, size))
     return gameboards
 
 if __name__ == "__main__":
-    gameboards = open_gameboards()
-    main(gameboards)
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Rush Hour game with a graphical interface.")
+    parser.add_argument("--no-cache", dest="no_cache", action='store_true', help="set this flag to True, the breadth search always runs instead of reusing solutions from data/solution_cache.sqlite")
+    parser.add_argument("--profile", type=int, nargs='?', const=1, default=None, metavar='EVERY', help="profile 1 in EVERY algorithm runs with cProfile, written to data/profiles/<algorithm>/board<number>_run<run>.prof and .collapsed (default: 1 when given)")
+    parser.add_argument("--pack", default=None, help="play the puzzles of a pack made by pack_boards.py, instead of the csv files in data/gameboards")
+    args = parser.parse_args()
+
+    gameboards = PuzzlePack(args.pack) if args.pack else open_gameboards()
+    main(gameboards, None if args.no_cache else SolutionCache(), RunProfiler(args.profile) if args.profile else None)
\ No newline at end of file
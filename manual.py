@@ -1,11 +1,14 @@
-import pandas as pd
 import os
 import argparse
 from code_files.classes.board_setup import Vehicle as Vehicle
 from code_files.classes.board_setup import Board as Board
 from code_files.algorithms.user import user_move as user_move
+from code_files.classes.distance_table import DistanceTable
+from code_files.classes.solution_cache import SolutionCache
+from code_files.classes.gameboards import board_size
+from code_files.classes.puzzle_pack import PuzzlePack
 
-def main(gameboards, user_input, random_solver, no_reverse_solver, astar_solver, deep_solver, broad_solver):
+def main(gameboards, user_input, random_solver, no_reverse_solver, astar_solver, deep_solver, broad_solver, heuristic='blocking', bidirectional_solver=False, ida_solver=False, table_solver=False, cache=None):
     board_number = None
 
     while board_number is None or board_number < 0 or board_number >= len(gameboards):
@@ -27,14 +30,36 @@ def main(gameboards, user_input, random_solver, no_reverse_solver, astar_solver,
     if no_reverse_solver:
         board.no_reverse_solve()
 
+    # Solve with the search algorithms, reusing earlier solutions from the cache
+    def search(solver, solve):
+        if cache is not None:
+            cache.solve(board, solver, solve)
+        else:
+            solve(board)
+
     if astar_solver:
-        board.astar_solve()
+        search(f'A* ({heuristic})', lambda board: board.astar_solve(heuristic=heuristic))
     
     if deep_solver:
         board.depth_search()
 
     if broad_solver:
-        board.breadth_search()
+        search('Breadth-first', lambda board: board.breadth_search())
+
+    if bidirectional_solver:
+        search('Bidirectional', lambda board: board.bidirectional_search())
+
+    if ida_solver:
+        search(f'IDA* ({heuristic})', lambda board: board.ida_star_solve(heuristic=heuristic))
+
+    if table_solver:
+        table = DistanceTable.open_for(board)
+        moves = table.solve(board) if table is not None else None
+        if moves is None:
+            print("This board is not in a distance table, build the tables with build_tables.py")
+        else:
+            board.apply_moves(moves)
+            print(f"Game can be won in {len(moves)}: {moves}")
 
     if board.is_won():
         board.print_board()
@@ -42,21 +67,19 @@ def main(gameboards, user_input, random_solver, no_reverse_solver, astar_solver,
 
 
 def open_gameboards():
+    import pandas as pd
+
     # Saves the boards in a list. 
     gameboards = []
     path = os.path.join(os.getcwd(), 'data/gameboards')
     for filename in os.listdir(path):
-        size = int(filename[8])
-        if size == 1:
-            size = 12
+        size = board_size(filename)
         board_df = pd.read_csv(os.path.join(path, filename))
         board_df.set_index('car', inplace=True)
         gameboards.append((board_df, size))
     return gameboards
 
 if __name__ == "__main__":
-    gameboards = open_gameboards()
-
     # Set-up parsing command line arguments
     parser = argparse.ArgumentParser(description = "Rush Hour game, either play the game or solve it using an algorithm.")
 
@@ -67,11 +90,17 @@ if __name__ == "__main__":
     parser.add_argument("-as", "--astar_solver", action='store_true', help="set this flag to True, game will be solved using a a-star algorithm")
     parser.add_argument("-ds", "--deep_solver", action='store_true', help="set this flag to True, game will be solved using a deepsearch algorithm")
     parser.add_argument("-bs", "--broad_solver", action='store_true', help="set this flag to True, game will be solved using a broadsearch algorithm")
-    #parser.add_argument("-as", "--astar_solver", action='store_true', help="set this flag to True, game will be solved using an Astar algorithm")
+    parser.add_argument("-bd", "--bidirectional_solver", action='store_true', help="set this flag to True, game will be solved using a bidirectional broadsearch algorithm")
+    parser.add_argument("-id", "--ida_solver", action='store_true', help="set this flag to True, game will be solved using an iterative deepening a-star algorithm")
+    parser.add_argument("-tb", "--table_solver", action='store_true', help="set this flag to True, game will be solved by looking up the distance table built by build_tables.py")
+    parser.add_argument("-hr", "--heuristic", choices=['blocking', 'exit_distance'], default='blocking', help="heuristic used by the (iterative deepening) a-star algorithm (default: blocking)")
+    parser.add_argument("--no-cache", dest="no_cache", action='store_true', help="set this flag to True, the search algorithms always run instead of reusing solutions from data/solution_cache.sqlite")
+    parser.add_argument("--pack", default=None, help="choose from the puzzles of a pack made by pack_boards.py, instead of the csv files in data/gameboards")
 
 
     # Read arguments from command line
     args = parser.parse_args()
+    gameboards = PuzzlePack(args.pack) if args.pack else open_gameboards()
 
     # Run main with provided arguments
-    main(gameboards, args.user_input, args.random_solve, args.no_reverse_solve, args.astar_solver, args.deep_solver, args.broad_solver)
\ No newline at end of file
+    main(gameboards, args.user_input, args.random_solve, args.no_reverse_solve, args.astar_solver, args.deep_solver, args.broad_solver, args.heuristic, args.bidirectional_solver, args.ida_solver, args.table_solver, None if args.no_cache else SolutionCache())
\ No newline at end of file
@@ -0,0 +1,40 @@
+"""
+This script converts the gameboard csv files in a directory to one puzzle pack.
+
+The pack is a binary file that `main.py --pack`, `manual.py --pack`,
+`gather_data.py --pack` and `PuzzlePack` read one puzzle at a time, without
+loading the other puzzles. The puzzles are stored in the order of the filenames,
+so the first csv file becomes puzzle 0.
+
+Usage:
+    python pack_boards.py [-i <directory>] [-o <path>]
+
+Optional arguments:
+    -i, --input <directory>
+    -o, --output <path>
+"""
+
+import argparse
+import os
+
+from code_files.classes.gameboards import gameboard_paths
+from code_files.classes.puzzle_pack import PuzzlePack
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert the gameboard csv files to a puzzle pack.")
+    parser.add_argument('-i', '--input', default=os.path.join('data', 'gameboards'), help='Directory with the csv files (default: data/gameboards)')
+    parser.add_argument('-o', '--output', default=os.path.join('data', 'gameboards.pack'), help='Path of the pack (default: data/gameboards.pack)')
+    args = parser.parse_args()
+
+    paths = gameboard_paths(args.input)
+    pack = PuzzlePack.from_csvs(args.output, paths)
+    for puzzle_id, path in enumerate(paths):
+        size, num_vehicles, _ = pack.info(puzzle_id)
+        print(f"{puzzle_id}: {os.path.basename(path)}, {size}x{size} with {num_vehicles} vehicles")
+    print(f"{len(pack)} puzzles written to {args.output}, {os.path.getsize(args.output)} bytes")
+    pack.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+"""
+This script solves boards without the interface, plotting or pandas, so it starts fast.
+It is meant for scripts, worker processes and regression runs that solve many boards.
+
+The path is a gameboard csv file, a directory of csv files such as `data/gameboards`,
+or a pack made by pack_boards.py or corpus.py. One board is solved and its moves are
+printed, one (vehicle, movement) move per line. A directory, or a pack without -i, is
+solved as a batch on -j processes, and every board gets one line of JSON with its
+solution length, whether it is optimal, the expanded states, the time and the memory.
+
+Usage:
+    python solve.py <csv file, directory or pack> [optional arguments]
+
+Optional arguments:
+    -i, --id <puzzle id>
+    -a, --algorithm <breadth_first|bidirectional|a_star|ida_star>
+    -hr, --heuristic <blocking|exit_distance>
+    -mm, --move_max <move_max>
+    -t, --time_max <seconds>
+    -j, --jobs <jobs>
+    -o, --output <path>
+    --json
+    --memory
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import nullcontext
+
+from code_files.classes.budget import Budget
+from code_files.classes.distance_table import DistanceTable
+from code_files.classes.gameboards import gameboard_paths, load_board
+from code_files.classes.puzzle_pack import PuzzlePack
+from code_files.algorithms.solvers import SOLVERS, solve
+
+# Packs opened by this process, by path
+packs = {}
+
+
+def open_pack(path):
+    """Returns the pack at a path, it is opened once per process."""
+    if path not in packs:
+        packs[path] = PuzzlePack(path)
+    return packs[path]
+
+
+def open_board(path, puzzle_id=0):
+    """
+    Sets up a board from a gameboard csv file or a puzzle of a pack.
+
+    Parameters
+    ----------
+        path str : Path to the csv file or the pack (.pack).
+        puzzle_id int : Id of the puzzle in the pack.
+
+    Returns
+    -------
+        board Board : The board in its starting state.
+    """
+    if path.endswith('.pack'):
+        return open_pack(path).board(puzzle_id)
+    return load_board(path)
+
+
+def board_tasks(path, puzzle_id=None):
+    """
+    Lists the boards at a path.
+
+    Parameters
+    ----------
+        path str : A csv file, a directory of csv files or a pack.
+        puzzle_id int : Only this puzzle of a pack, None for all puzzles.
+
+    Returns
+    -------
+        tasks list : (path, puzzle id) of every board, the puzzle id is None for csv files.
+    """
+    if os.path.isdir(path):
+        return [(csv_path, None) for csv_path in gameboard_paths(path)]
+    if path.endswith('.pack'):
+        if puzzle_id is not None:
+            return [(path, puzzle_id)]
+        return [(path, puzzle) for puzzle in range(len(open_pack(path)))]
+    return [(path, None)]
+
+
+def peak_rss():
+    """
+    Returns the largest resident memory of this process so far in bytes, None where it cannot be read.
+    It is a high-water mark over every board the process solved, not the memory of the last one.
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    # Linux reports kilobytes, macOS bytes
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == 'darwin' else 1024)
+
+
+def solve_task(task, algorithm, heuristic='blocking', move_max=None, time_max=None, memory=False):
+    """
+    Solves one board of a batch.
+
+    Parameters
+    ----------
+        task tuple : (path, puzzle id) from board_tasks.
+        algorithm str : The name of the algorithm, a key of SOLVERS.
+        heuristic str : The heuristic of A* and IDA*.
+        move_max int : Maximum number of states to expand, None for no limit.
+        time_max float : Maximum number of seconds, None for no limit.
+        memory bool : Trace the memory of the search, this slows it down.
+
+    Returns
+    -------
+        row dict : The result of the board, as written to a JSON line.
+    """
+    path, puzzle_id = task
+    board = open_board(path, puzzle_id)
+
+    # The optimal number of moves is known for pack puzzles that store it and boards with a distance table
+    optimal_moves = open_pack(path).info(puzzle_id)[2] if puzzle_id is not None else None
+    if optimal_moves is None:
+        table = DistanceTable.open_for(board)
+        distance = table.distance(board.get_state()) if table is not None else None
+        if distance is not None:
+            optimal_moves = -1 if distance == DistanceTable.UNSOLVABLE else distance
+
+    if memory:
+        tracemalloc.start()
+    result = solve(board, algorithm, heuristic, Budget(move_max, time_max))
+    peak_memory = None
+    if memory:
+        peak_memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    length = result.solution_length()
+    if optimal_moves is None:
+        optimal = None
+    elif result.solved:
+        optimal = length == optimal_moves
+    else:
+        # A search that finished without a solution has found the board cannot be won
+        optimal = optimal_moves == -1 and result.stopped is None
+    return {'board': os.path.basename(path), 'id': puzzle_id, 'algorithm': algorithm, 'solved': result.solved,
+            'stopped': result.stopped, 'moves': length, 'optimal_moves': optimal_moves, 'optimal': optimal,
+            'nodes_expanded': result.nodes_expanded, 'peak_frontier': result.peak_frontier, 'time': result.runtime,
+            'peak_memory': peak_memory, 'worker_max_rss': peak_rss()}
+
+
+def _solve_task(arguments):
+    return solve_task(*arguments)
+
+
+def solve_batch(tasks, args, output):
+    """Solves the boards on args.jobs processes and writes a JSON line per board, in order, to output."""
+    arguments = [(task, args.algorithm, args.heuristic, args.move_max, args.time_max, args.memory) for task in tasks]
+    start_time = time.perf_counter()
+    solved = 0
+
+    pool = multiprocessing.Pool(args.jobs) if args.jobs > 1 else nullcontext()
+    with pool:
+        rows = pool.imap(_solve_task, arguments) if args.jobs > 1 else map(_solve_task, arguments)
+        try:
+            for row in rows:
+                solved += row['solved']
+                output.write(json.dumps(row) + '\n')
+                output.flush()
+        except BrokenPipeError:
+            # The reader stopped early, like head, so the lines left are not wanted. Python
+            # flushes the output again at exit, which would fail again without devnull
+            os.dup2(os.open(os.devnull, os.O_WRONLY), output.fileno())
+            sys.exit(1)
+
+    seconds = time.perf_counter() - start_time
+    rate = f", {len(tasks) / seconds:.1f} boards per second" if tasks and seconds > 0 else ''
+    print(f"{solved} of {len(tasks)} boards solved in {seconds:.2f} seconds{rate}", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Solve boards without the interface.")
+    parser.add_argument('path', help='Gameboard csv file, directory of csv files or puzzle pack')
+    parser.add_argument('-i', '--id', type=int, default=None, help='Id of the puzzle in the pack (default: all puzzles)')
+    parser.add_argument('-a', '--algorithm', choices=sorted(SOLVERS), default='bidirectional', help='Search algorithm (default: bidirectional)')
+    parser.add_argument('-hr', '--heuristic', choices=['blocking', 'exit_distance'], default='blocking', help='Heuristic of A* and IDA* (default: blocking)')
+    parser.add_argument('-mm', '--move_max', type=int, default=None, help='Maximum number of states to expand per board (default: no limit)')
+    parser.add_argument('-t', '--time_max', type=float, default=None, help='Maximum number of seconds per board (default: no limit)')
+    parser.add_argument('-j', '--jobs', type=int, default=1, help='Number of processes that solve a batch (default: 1)')
+    parser.add_argument('-o', '--output', default=None, help='File the JSON lines are written to (default: standard output)')
+    parser.add_argument('--json', action='store_true', help='Write a JSON line for a single board too, instead of its moves')
+    parser.add_argument('--memory', action='store_true', help='Trace the peak memory of every search, which slows the search down')
+    args = parser.parse_args()
+
+    tasks = board_tasks(args.path, args.id)
+    if len(tasks) > 1 or args.json or os.path.isdir(args.path):
+        with open(args.output, 'w') if args.output else nullcontext(sys.stdout) as output:
+            solve_batch(tasks, args, output)
+        return
+
+    path, puzzle_id = tasks[0]
+    board = open_board(path, puzzle_id)
+    result = solve(board, args.algorithm, args.heuristic, Budget(args.move_max, args.time_max))
+
+    name = os.path.basename(path) + (f" #{puzzle_id}" if puzzle_id is not None else '')
+    if result.solved:
+        print(f"{name}: solved in {result.solution_length()} moves, {result.nodes_expanded} states expanded, {result.runtime:.3f} seconds")
+        for vehicle, movement in result.moves:
+            print(vehicle, movement)
+    elif result.stopped is None:
+        print(f"{name}: cannot be won, {result.nodes_expanded} states expanded, {result.runtime:.3f} seconds")
+    else:
+        print(f"{name}: stopped by the {result.stopped} limit, {result.nodes_expanded} states expanded, {result.runtime:.3f} seconds")
+
+
+if __name__ == "__main__":
+    main()